@@ -7,6 +7,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Schema
 
 from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.ParameterSweep import ParameterSweep
+from starlette.concurrency import run_in_threadpool
 import numpy as np
 
 # plotly imports
@@ -34,13 +36,14 @@ def sample_sim_history_idxs(sim, num_of_points=200):
     hist_step = sim.max_time / num_of_points
     idxs = [0]
     last_hist_time = 0
-    while hist_idx < (len(sim.hist_times) - 1):
+    hist_times = sim.hist_times
+    while hist_idx < (len(hist_times) - 1):
         hist_idx += 1
-        if sim.hist_times[hist_idx] - last_hist_time < hist_step:
+        if hist_times[hist_idx] - last_hist_time < hist_step:
             continue
 
-        if hist_idx < (len(sim.hist_times) - 1):
-            last_hist_time = sim.hist_times[hist_idx]
+        if hist_idx < (len(hist_times) - 1):
+            last_hist_time = hist_times[hist_idx]
             idxs.append(hist_idx)
     return idxs
 
@@ -149,7 +152,9 @@ async def overall_plot_simulation(sim_input: OverallSimInput):
 
         input_dicts.append(inp_dict)
 
-    res = [generate_trace_api(d) for d in input_dicts]
+    # run the grid on a process pool without blocking the event loop
+    sweep = ParameterSweep(input_dicts)
+    res = (await run_in_threadpool(sweep.run)).to_dict('records')
 
     ret = {}
     ret['prob_cold_percent'] = [round(r['prob_cold'] * 100, 6) for r in res]
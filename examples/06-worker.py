@@ -5,6 +5,8 @@ import sys
 import struct
 import multiprocessing
 
+import numpy as np
+
 from examples.sim_trace import generate_trace
 
 port = "5556"
@@ -15,7 +17,9 @@ socket_addr = "tcp://127.0.0.1:%s" % port
 
 worker_count = multiprocessing.cpu_count() * 2 + 1
 stop_signal = False
-def worker(context=None, name="worker"):
+def worker(context=None, name="worker", seed=None):
+    # forked workers inherit the same global random state, so each worker needs its own stream
+    rng = np.random.default_rng(seed)
     context = context or zmq.Context.instance()
     worker = context.socket(zmq.ROUTER)
     worker.connect(socket_addr)
@@ -31,13 +35,14 @@ def worker(context=None, name="worker"):
             ident, message = worker.recv_multipart()
             
             # calculate trace
-            msg = struct.pack("d", generate_trace())
+            msg = struct.pack("d", generate_trace(rng=rng))
             
             worker.send_multipart([ident, msg])
 
 if __name__ == "__main__":
     worker_names = [f"worker-{i}" for i in range(worker_count)]
-    worker_threads = [multiprocessing.Process(target=worker, args=(None,n)) for n in worker_names]
+    worker_seeds = np.random.SeedSequence().spawn(worker_count)
+    worker_threads = [multiprocessing.Process(target=worker, args=(None,n,sd)) for n,sd in zip(worker_names, worker_seeds)]
     _ = [t.start() for t in worker_threads]
 
     while True:
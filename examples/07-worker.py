@@ -6,6 +6,8 @@ import pickle
 import struct
 import multiprocessing
 
+import numpy as np
+
 from examples.sim_trace import generate_trace_api
 
 port = "5556"
@@ -16,7 +18,9 @@ socket_addr = "tcp://127.0.0.1:%s" % port
 
 worker_count = multiprocessing.cpu_count() * 2 + 1
 stop_signal = False
-def worker(context=None, name="worker"):
+def worker(context=None, name="worker", seed=None):
+    # forked workers inherit the same global random state, so each worker needs its own stream
+    rng = np.random.default_rng(seed)
     context = context or zmq.Context.instance()
     worker = context.socket(zmq.ROUTER)
     worker.connect(socket_addr)
@@ -34,14 +38,15 @@ def worker(context=None, name="worker"):
             data = pickle.loads(message)
 
             # calculate trace
-            msg = generate_trace_api(data)
+            msg = generate_trace_api(data, rng=rng)
             msg = pickle.dumps(msg)
             
             worker.send_multipart([ident, msg])
 
 if __name__ == "__main__":
     worker_names = [f"worker-{i}" for i in range(worker_count)]
-    worker_threads = [multiprocessing.Process(target=worker, args=(None,n)) for n in worker_names]
+    worker_seeds = np.random.SeedSequence().spawn(worker_count)
+    worker_threads = [multiprocessing.Process(target=worker, args=(None,n,sd)) for n,sd in zip(worker_names, worker_seeds)]
     _ = [t.start() for t in worker_threads]
 
     while True:
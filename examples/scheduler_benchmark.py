@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.ParServerlessSimulator import ParServerlessSimulator
+from simfaas.Scheduler import NewestFirstScheduler, OldestFirstScheduler, RandomScheduler, \
+    LRUScheduler, LeastLoadedScheduler, BinPackingScheduler
+
+arrival_rate = 50
+warm_service_rate = 1/2.016
+cold_service_rate = 1/2.163
+expiration_threshold = 30
+max_time = 1000
+
+concurrency_value = 10
+
+schedulers = {
+    'newest': NewestFirstScheduler,
+    'oldest': OldestFirstScheduler,
+    'random': RandomScheduler,
+    'lru': LRUScheduler,
+}
+
+par_schedulers = {
+    **schedulers,
+    'least-loaded': LeastLoadedScheduler,
+    'bin-packing': BinPackingScheduler,
+}
+
+
+def benchmark(sim_class, scheduler_class, **kwargs):
+    np.random.seed(0)
+    sim = sim_class(scheduler=scheduler_class(), arrival_rate=arrival_rate, warm_service_rate=warm_service_rate,
+                    cold_service_rate=cold_service_rate, expiration_threshold=expiration_threshold,
+                    max_time=max_time, **kwargs)
+    start = time.time()
+    sim.generate_trace(debug_print=False, progress=False)
+    elapsed = time.time() - start
+    results = sim.get_result_dict()
+    return {
+        'events': len(sim.hist_times),
+        'elapsed_sec': elapsed,
+        'prob_cold': results['prob_cold'],
+        'inst_count_avg': results['inst_count_avg'],
+        'inst_running_count_avg': results['inst_running_count_avg'],
+    }
+
+
+if __name__ == "__main__":
+    rows = []
+    for name, scheduler_class in schedulers.items():
+        rows.append({'simulator': 'single', 'scheduler': name, **benchmark(ServerlessSimulator, scheduler_class)})
+    for name, scheduler_class in par_schedulers.items():
+        rows.append({'simulator': 'parallel', 'scheduler': name,
+                     **benchmark(ParServerlessSimulator, scheduler_class, concurrency_value=concurrency_value)})
+
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -4,6 +4,7 @@ from simfaas.SimProcess import ExpSimProcess
 from simfaas.FunctionInstance import FunctionInstance
 from simfaas.ServerlessTemporalSimulator import ServerlessTemporalSimulator
 from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.Utility import spawn_seeds
 
 cold_service_rate = 1/2.163
 warm_service_rate = 1/2.016
@@ -15,17 +16,20 @@ max_time = 300
 running_function_count = 3
 idle_function_count = 5
 
-cold_service_process = ExpSimProcess(rate=cold_service_rate)
-warm_service_process = ExpSimProcess(rate=warm_service_rate)
-
-def generate_trace_api(data):
-    sim = ServerlessSimulator(**data)
+def generate_trace_api(data, rng=None):
+    sim = ServerlessSimulator(**data, rng=rng)
     sim.generate_trace(debug_print=False, progress=False)
     results = sim.get_result_dict()
     results.update(data)
     return results
 
-def generate_trace():
+def generate_trace(rng=None):
+    # independent random streams for each process, global numpy state is used if rng is None
+    arrival_seed, cold_seed, warm_seed = spawn_seeds(rng, 3) if rng is not None else (None, None, None)
+    arrival_process = ExpSimProcess(rate=arrival_rate, rng=arrival_seed)
+    cold_service_process = ExpSimProcess(rate=cold_service_rate, rng=cold_seed)
+    warm_service_process = ExpSimProcess(rate=warm_service_rate, rng=warm_seed)
+
     idle_functions = []
     for _ in range(idle_function_count):
         f = FunctionInstance(0,
@@ -57,10 +61,10 @@ def generate_trace():
 
         running_functions.append(f)
 
-    sim = ServerlessTemporalSimulator(running_functions, idle_functions, arrival_rate=arrival_rate, warm_service_rate=warm_service_rate, cold_service_rate=cold_service_rate,
+    sim = ServerlessTemporalSimulator(running_functions, idle_functions, arrival_process=arrival_process, warm_service_process=warm_service_process, cold_service_process=cold_service_process,
                                         expiration_threshold=expiration_threshold, max_time=max_time)
     sim.generate_trace(debug_print=False, progress=False)
     return sim.get_cold_start_prob()
 
 if __name__ == "__main__":
-    print([generate_trace() for _ in range(10)])
+    print([generate_trace(rng=seed) for seed in spawn_seeds(0, 10)])
@@ -1,3 +1,7 @@
+# integer codes used for the states of function instances
+COLD, WARM, IDLE, TERM = 0, 1, 2, 3
+STATE_NAMES = ('COLD', 'WARM', 'IDLE', 'TERM')
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
 
 
 class FunctionInstance:
@@ -14,6 +18,10 @@ class FunctionInstance:
     expiration_threshold : float
         The amount of time it takes for an instance to get expired and the resources consumed by it released after processing the last request
     """
+    # no per-instance __dict__, the simulators might keep thousands of instances alive
+    __slots__ = ('cold_service_process', 'warm_service_process', 'expiration_threshold', 'creation_time',
+                 'state_code', 'is_busy', 'is_cold', 'next_departure', 'next_termination')
+
     def __init__(self, t, cold_service_process, warm_service_process, expiration_threshold):
         super().__init__()
 
@@ -25,7 +33,7 @@ class FunctionInstance:
         self.creation_time = t
 
         # set current state variables
-        self.state = 'COLD'
+        self.state_code = COLD
         self.is_busy = True
         self.is_cold = True
 
@@ -46,6 +54,17 @@ class FunctionInstance:
     def __str__(self):
         return f"State: {self.state} \t Departure: {self.next_departure:8.2f} \t Termination: {self.next_termination:8.2f}"
 
+    @property
+    def state(self):
+        """str: The name of the current state (`COLD`, `WARM`, `IDLE`, or `TERM`), internally stored as an integer code in `state_code`. Can be set using either the name or the code."""
+        return STATE_NAMES[self.state_code]
+
+    @state.setter
+    def state(self, value):
+        if isinstance(value, str):
+            value = STATE_CODES[value]
+        self.state_code = value
+
     def get_life_span(self):
         """Get the lifespan of the instance (from creation until the termination)
 
@@ -94,11 +113,11 @@ class FunctionInstance:
         Exception
             Raises if currently process a request by being in `COLD` or `WARM` states
         """
-        if self.state == 'COLD' or self.state == 'WARM':
+        if self.state_code == COLD or self.state_code == WARM:
             raise Exception('instance is already busy!')
 
-        elif self.state == 'IDLE':
-            self.state = 'WARM'
+        elif self.state_code == IDLE:
+            self.state_code = WARM
             self.is_busy = True
             self.next_departure = t + self.warm_service_process.generate_trace()
             self.update_next_termination()
@@ -111,7 +130,7 @@ class FunctionInstance:
         bool
             True if idle, false otherwise
         """
-        return self.state == 'IDLE'
+        return self.state_code == IDLE
 
     def is_ready(self):
         """Whether or not the instance is ready to accept new requests. Here, same as is_idle()
@@ -137,14 +156,14 @@ class FunctionInstance:
             Raises if already in `TERM` state, since no other internal transitions are possible
         """
         # next transition is a departure
-        if self.state == 'COLD' or self.state == 'WARM':
-            self.state = 'IDLE'
+        if self.state_code == COLD or self.state_code == WARM:
+            self.state_code = IDLE
             self.is_busy = False
             self.is_cold = False
 
         # next transition is a termination
-        elif self.state == 'IDLE':
-            self.state = 'TERM'
+        elif self.state_code == IDLE:
+            self.state_code = TERM
             self.is_busy = False
 
         # if terminated
@@ -167,11 +186,23 @@ class FunctionInstance:
             The seconds remaining until the next transition
         """
         # next transition would be termination
-        if self.state == 'IDLE':
+        if self.state_code == IDLE:
             return self.get_next_termination(t)
         # next transition would be departure
         return self.get_next_departure(t)
 
+    def get_next_event_time(self):
+        """Get the time at which the next transition is going to happen, which is used for ordering the instances in the event queue of the simulator.
+
+        Returns
+        -------
+        float
+            The (absolute) simulation time of the next transition
+        """
+        if self.state_code == IDLE:
+            return self.next_termination
+        return self.next_departure
+
     def get_next_departure(self, t):
         """Get the time until the next departure
 
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+class HistoryBuffer:
+    """HistoryBuffer is a typed, growable numpy array used by the simulators to record the history of events. Values
+are appended one at a time into a small python list which is flushed into a preallocated array every `flush_size`
+values, and the array doubles in size when it runs out of space. This way, appending is as cheap as appending to a
+list, while the history is stored compactly (no boxed python objects) and can be accessed as a numpy array without
+any copying.
+
+    Parameters
+    ----------
+    dtype : numpy.dtype, optional
+        The type of the recorded values, by default float
+    capacity : int, optional
+        The initial capacity of the buffer, by default 1024
+    flush_size : int, optional
+        The number of appended values kept in a list before being moved into the array, by default 1024
+    """
+    def __init__(self, dtype=float, capacity=1024, flush_size=1024):
+        super().__init__()
+
+        self.data = np.empty(max(capacity, 1), dtype=dtype)
+        self.size = 0
+        self.flush_size = flush_size
+        self.pending = []
+
+    @classmethod
+    def from_array(cls, values):
+        """Create a buffer holding the values of an existing array, without copying it.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            The values already recorded
+
+        Returns
+        -------
+        simfaas.HistoryBuffer.HistoryBuffer
+            The buffer wrapping `values`
+        """
+        buffer = cls.__new__(cls)
+        buffer.data = values
+        buffer.size = len(values)
+        buffer.flush_size = 1024
+        buffer.pending = []
+        return buffer
+
+    def __len__(self):
+        return self.size + len(self.pending)
+
+    def append(self, value):
+        """Append a value to the end of the buffer.
+
+        Parameters
+        ----------
+        value : object
+            The value to be recorded, should be convertible to the type of the buffer
+        """
+        pending = self.pending
+        pending.append(value)
+        if len(pending) >= self.flush_size:
+            self.flush()
+
+    def append_repeated(self, value, count):
+        """Append the same value `count` times to the end of the buffer.
+
+        Parameters
+        ----------
+        value : object
+            The value to be recorded, should be convertible to the type of the buffer
+        count : int
+            The number of times the value is recorded
+        """
+        pending = self.pending
+        pending.extend([value] * count)
+        if len(pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        """Move the pending values into the array, doubling its capacity as many times as needed.
+        """
+        count = len(self.pending)
+        if count == 0:
+            return
+        if self.size + count > len(self.data):
+            capacity = max(len(self.data), 1)
+            while self.size + count > capacity:
+                capacity *= 2
+            data = np.empty(capacity, dtype=self.data.dtype)
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+        self.data[self.size:self.size + count] = self.pending
+        self.size += count
+        self.pending = []
+
+    def view(self):
+        """Get a read-only view of the recorded values.
+
+        Returns
+        -------
+        numpy.ndarray
+            The recorded values, sharing memory with the buffer
+        """
+        self.flush()
+        values = self.data[:self.size]
+        values.flags.writeable = False
+        return values
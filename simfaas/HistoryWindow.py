@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+
+from simfaas.Utility import encode_states, run_length_encode, group_by_codes
+
+
+class HistoryWindow:
+    """HistoryWindow is a view over a range of the recorded history of a simulation, which is used to calculate
+statistics over a part of the trace (e.g. skipping the transient part in the beginning). The window only holds the
+range of indices, and all the arrays it gives out are slices of the history arrays of the simulator, so creating
+windows and analyzing them does not copy the history. The time averages and request statistics are calculated in
+chunks of `chunk_size` events, so they can be used on traces loaded as memory-mapped arrays
+(:func:`~simfaas.ServerlessSimulator.ServerlessSimulator.load_trace`) that do not fit in memory. The same chunked
+calculation is used for traces in memory, so the results do not depend on where the history is stored.
+
+    Parameters
+    ----------
+    sim : simfaas.ServerlessSimulator.ServerlessSimulator
+        The simulator whose history is being analyzed, should have finished generating its trace with `record_history`
+    start : int
+        The index of the first event in the window
+    stop : int
+        The index after the last event in the window
+    chunk_size : int, optional
+        The number of events processed at once, by default None which uses `analysis_chunk_size` of the simulator
+    start_time : float, optional
+        If set, the time spent before `start_time` is not included in the time lengths of the events, by default None
+    end_time : float, optional
+        If set, the time spent after `end_time` is not included in the time lengths of the events, by default None
+    """
+    def __init__(self, sim, start, stop, chunk_size=None, start_time=None, end_time=None):
+        super().__init__()
+
+        self.sim = sim
+        self.start = start
+        self.stop = stop
+        self.chunk_size = chunk_size or sim.analysis_chunk_size
+        self.start_time = start_time
+        self.end_time = end_time
+
+    def __len__(self):
+        return self.stop - self.start
+
+    @property
+    def times(self):
+        """numpy.ndarray: The time of each event in the window"""
+        return self.sim.hist_times[self.start:self.stop]
+
+    @property
+    def time_lengths(self):
+        """numpy.ndarray: The amount of time spent after each event in the window, until the next event (or the end of the window)"""
+        if self.start_time is None and self.end_time is None:
+            return self.sim.time_lengths[self.start:self.stop]
+        return self.get_time_lengths(self.start, self.stop)
+
+    def get_time_lengths(self, chunk_start, chunk_stop):
+        """Get the amount of time spent after each event in a range of the window, clipped to [`start_time`, `end_time`].
+
+        Parameters
+        ----------
+        chunk_start : int
+            The index of the first event
+        chunk_stop : int
+            The index after the last event
+
+        Returns
+        -------
+        numpy.ndarray
+            The time lengths of the events
+        """
+        times = self.sim.hist_times[chunk_start:chunk_stop + 1]
+        if self.start_time is not None:
+            times = np.maximum(times, self.start_time)
+        if self.end_time is not None:
+            times = np.minimum(times, self.end_time)
+        return np.diff(times)
+
+    def get_values(self, values):
+        """Get the part of an array of values (with the same dimensions as the `hist_*` arrays) in the window.
+
+        Parameters
+        ----------
+        values : list, numpy.ndarray
+            The values for all of the events of the trace
+
+        Returns
+        -------
+        list, numpy.ndarray
+            The values in the window, a view for numpy arrays
+        """
+        return values[self.start:self.stop]
+
+    def iter_chunks(self):
+        """Iterate over the window in chunks of `chunk_size` events.
+
+        Yields
+        -------
+        (int, int, numpy.ndarray)
+            (chunk_start, chunk_stop, time_lengths) where chunk_start and chunk_stop are the range of indices in
+            the chunk, and time_lengths is the amount of time spent after each event in the chunk
+        """
+        for chunk_start in range(self.start, self.stop, self.chunk_size):
+            chunk_stop = min(chunk_start + self.chunk_size, self.stop)
+            yield chunk_start, chunk_stop, self.get_time_lengths(chunk_start, chunk_stop)
+
+    def get_time_weighted_sum(self, values):
+        """Get the sum of the values in the window, each weighted by the amount of time spent after its event.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            The values with the same dimensions as the `hist_*` arrays
+
+        Returns
+        -------
+        float
+            The time-weighted sum of the values
+        """
+        total = 0
+        for chunk_start, chunk_stop, time_lengths in self.iter_chunks():
+            total += (values[chunk_start:chunk_stop] * time_lengths).sum()
+        return total
+
+    def calculate_time_average(self, values):
+        """Calculate the portion of time spent in each of the values in the window.
+
+        Parameters
+        ----------
+        values : list
+            A list of values with the same dimensions as history array (number of transitions)
+
+        Returns
+        -------
+        (list, list)
+            returns (unq_vals, val_times) where unq_vals is the unique values inside the values list
+            and val_times is the portion of the time that is spent in that value.
+        """
+        # get unique values, and the total time spent in each, in the order of their first appearance
+        total_times = {}
+        for chunk_start, chunk_stop, time_lengths in self.iter_chunks():
+            unq_vals, codes = encode_states(values[chunk_start:chunk_stop])
+            val_times = np.bincount(codes, weights=time_lengths, minlength=len(unq_vals))
+            for val, val_time in zip(unq_vals, val_times):
+                total_times[val] = total_times.get(val, 0) + val_time
+
+        unq_vals = list(total_times.keys())
+        val_times = np.array(list(total_times.values()), dtype=float)
+
+        # convert to percent
+        val_times = val_times / val_times.sum()
+        return unq_vals, val_times
+
+    def get_request_custom_states(self, hist_states):
+        """Get request statistics for an array of custom states in the window.
+
+        Parameters
+        ----------
+        hist_states : list[object]
+            An array of custom states with the same dimensions as the `hist_*` arrays
+
+        Returns
+        -------
+        pandas.DataFrame
+            A pandas dataframe including different statistics like `p_cold` (probability of cold start)
+        """
+        req_cold_idxs = self.sim.hist_req_cold_idxs
+        req_warm_idxs = self.sim.hist_req_warm_idxs
+        req_rej_idxs = self.sim.hist_req_rej_idxs
+
+        # request counts for each state, in the order of their first appearance
+        req_counts = {}
+        for chunk_start, chunk_stop, _ in self.iter_chunks():
+            # encode states as integers
+            states, state_codes = encode_states(hist_states[chunk_start:chunk_stop])
+
+            # the event indices of requests are sorted, the requests arriving at the first event are not included
+            def count_reqs(req_idxs):
+                lo, hi = np.searchsorted(req_idxs, [max(chunk_start, self.start + 1), chunk_stop])
+                return np.bincount(state_codes[req_idxs[lo:hi] - chunk_start], minlength=len(states))
+
+            colds = count_reqs(req_cold_idxs)
+            warms = count_reqs(req_warm_idxs) + count_reqs(req_rej_idxs)
+            for state, cold, warm in zip(states, colds, warms):
+                prev_cold, prev_warm = req_counts.get(state, (0, 0))
+                req_counts[state] = (prev_cold + cold, prev_warm + warm)
+
+        states = list(req_counts.keys())
+        state_req_colds = np.array([c for c, _ in req_counts.values()], dtype=int)
+        state_req_warm = np.array([w for _, w in req_counts.values()], dtype=int)
+        state_req_rejs = np.zeros(len(states), dtype=int)
+
+        reqdf = pd.DataFrame(data = {'state': states, 'cold': state_req_colds, 'warm': state_req_warm, 'rej': state_req_rejs})
+        reqdf['total'] = reqdf['cold'] + reqdf['warm'] + reqdf['rej']
+        reqdf['p_cold'] = reqdf['cold'] / reqdf['total']
+        return reqdf
+
+    def analyze_custom_states(self, hist_states):
+        """Calculate the amount of time spent in each state each time we enterred that state in the window, and
+the time spent before each transition.
+
+        Parameters
+        ----------
+        hist_states : list[object]
+            An array of custom states with the same dimensions as the `hist_*` arrays
+
+        Returns
+        -------
+        dict[object, numpy.ndarray], dict[tuple, numpy.ndarray]
+            (residence_times, transition_times), refer to :func:`~simfaas.ServerlessSimulator.ServerlessSimulator.analyze_custom_states`
+        """
+        # encode states, and find the time spent in each visit to a state
+        unq_vals, codes = encode_states(self.get_values(hist_states))
+        run_codes, run_times = run_length_encode(codes, self.time_lengths)
+
+        # the last visit has not ended with a transition
+        from_codes = run_codes[:-1]
+        to_codes = run_codes[1:]
+        run_times = run_times[:-1]
+
+        num_states = len(unq_vals)
+        residence_times = {}
+        for code, times in enumerate(group_by_codes(from_codes, run_times, num_states)):
+            if len(times) > 0:
+                residence_times[unq_vals[code]] = times
+
+        # only encode the transitions that occur, there can be up to num_states ** 2 possible ones
+        transition_times = {}
+        unq_pairs, pair_codes = np.unique(from_codes * num_states + to_codes, return_inverse=True)
+        for pair, times in zip(unq_pairs.tolist(), group_by_codes(pair_codes.ravel(), run_times, len(unq_pairs))):
+            from_code, to_code = divmod(pair, num_states)
+            transition_times[(unq_vals[from_code], unq_vals[to_code])] = times
+
+        return residence_times, transition_times
@@ -0,0 +1,89 @@
+import heapq
+
+
+class InstanceQueue:
+    """InstanceQueue is a priority queue of function instances which is used by the simulators to find the instance
+with the smallest key (e.g. the soonest transition) in logarithmic time. Each instance has at most one valid entry in the
+queue. Updating or removing an instance does not touch the heap, instead the older entries are invalidated and lazily
+discarded when they reach the top of the heap.
+    """
+    def __init__(self):
+        super().__init__()
+
+        self.heap = []
+        # the version of the currently valid entry for each instance
+        self.versions = {}
+        self.version_counter = 0
+
+    def __len__(self):
+        return len(self.versions)
+
+    def __contains__(self, instance):
+        return instance in self.versions
+
+    def push(self, instance, key):
+        """Add an instance to the queue, or update its key if it is already in the queue.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance to be added
+        key : tuple
+            The key used for ordering the instances, smaller keys come out first. Keys should be unique among the
+            instances in the queue (e.g. by including the id of the instance as the last element).
+        """
+        self.version_counter += 1
+        self.versions[instance] = self.version_counter
+        heapq.heappush(self.heap, (key, self.version_counter, instance))
+
+        # get rid of invalidated entries if they are taking up most of the heap
+        if len(self.heap) > 2 * len(self.versions) + 64:
+            self.compact()
+
+    def remove(self, instance):
+        """Remove an instance from the queue, does nothing if the instance is not in the queue.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance to be removed
+        """
+        self.versions.pop(instance, None)
+
+    def peek(self):
+        """Get the instance with the smallest key without removing it from the queue.
+
+        Returns
+        -------
+        simfaas.FunctionInstance.FunctionInstance
+            The instance with the smallest key, or None if the queue is empty
+        """
+        heap = self.heap
+        versions = self.versions
+        while heap:
+            _, version, instance = heap[0]
+            if versions.get(instance) == version:
+                return instance
+            heapq.heappop(heap)
+        return None
+
+    def pop(self):
+        """Get the instance with the smallest key and remove it from the queue.
+
+        Returns
+        -------
+        simfaas.FunctionInstance.FunctionInstance
+            The instance with the smallest key, or None if the queue is empty
+        """
+        instance = self.peek()
+        if instance is not None:
+            heapq.heappop(self.heap)
+            del self.versions[instance]
+        return instance
+
+    def compact(self):
+        """Rebuild the heap using only the valid entries.
+        """
+        versions = self.versions
+        self.heap = [e for e in self.heap if versions.get(e[2]) == e[1]]
+        heapq.heapify(self.heap)
@@ -0,0 +1,267 @@
+# A faster simulator for serverless computing platforms with exponential processes
+
+from collections import deque
+
+import numpy as np
+from tqdm import tqdm
+
+from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.SimProcess import ExpSimProcess
+from simfaas.Scheduler import MRUScheduler
+from simfaas.Utility import create_rng, spawn_seeds
+
+
+class MarkovServerlessSimulator(ServerlessSimulator):
+    """MarkovServerlessSimulator is a faster alternative to :class:`~simfaas.ServerlessSimulator.ServerlessSimulator` for when the arrival, warm service, and cold service processes are all exponential (:class:`~simfaas.SimProcess.ExpSimProcess`), which makes the platform a continuous-time Markov chain. Since exponential processes are memoryless, the running instances are not tracked one by one: only the number of instances running a cold start and the number of instances running a warm request are kept, and the next event is sampled by competing exponential rates over these counts (Gillespie's algorithm). Only the idle instances are tracked individually, by their expiration time, since their expiration is deterministic. The whole simulation runs in a single loop over local variables, and random numbers are drawn in blocks of `block_size`.
+
+Since running instances have no identity, the following differ from :class:`~simfaas.ServerlessSimulator.ServerlessSimulator`:
+
+- Requests are always sent to the most recently used idle instance (the idle instance expiring last), so the idle instances form a queue where the oldest one expires first and the newest one receives the next request. This is the policy of :class:`~simfaas.Scheduler.MRUScheduler`, so the results follow the same distribution as :class:`~simfaas.ServerlessSimulator.ServerlessSimulator` with `scheduler=MRUScheduler()`. Other schedulers are not supported.
+- Lifespans of individual instances are not available, the average lifespan is calculated using Little's law, as the time-averaged number of instances divided by the rate at which instances are created. `hist_lifespans` stays empty, and the variance of lifespans is not available.
+- No instance objects are created, so `servers` and `prev_servers` stay empty.
+- The simulation stops once the time passes `max_time`, :func:`~simfaas.ServerlessSimulator.ServerlessSimulator.trace_condition` is not used.
+
+The history is only recorded if `record_history` is set, which is False by default, since recording each event takes more time than simulating it. For the rest of the parameters, refer to :class:`~simfaas.ServerlessSimulator.ServerlessSimulator`.
+
+    Parameters
+    ----------
+    block_size : int, optional
+        The number of random numbers drawn at once, by default 4096
+    record_history : bool, optional
+        Whether or not the history of events should be recorded, by default False
+
+    Raises
+    ------
+    ValueError
+        Raises if any of the processes is not an :class:`~simfaas.SimProcess.ExpSimProcess` (subclasses are not accepted either, since they can change how samples are generated), or if a scheduler other than :class:`~simfaas.Scheduler.MRUScheduler` is given
+    """
+    def __init__(self, *args, block_size=4096, record_history=False, **kwargs):
+        scheduler = kwargs.get('scheduler')
+        if scheduler is not None and type(scheduler) is not MRUScheduler:
+            raise ValueError("MarkovServerlessSimulator always uses the most recently used idle instance, only the MRUScheduler is supported!")
+
+        self.block_size = block_size
+        self.event_rng = None
+        super().__init__(*args, record_history=record_history, **kwargs)
+
+        processes = [self.arrival_process, self.warm_service_process, self.cold_service_process]
+        if not all(type(p) is ExpSimProcess for p in processes):
+            raise ValueError("Arrival, warm service, and cold service processes should all be ExpSimProcess!")
+
+    def set_rng(self, rng):
+        """Spawn independent random streams from `rng` for the processes, the scheduler, and the events of the simulation.
+
+        Parameters
+        ----------
+        rng : numpy.random.Generator, int, numpy.random.SeedSequence
+            The root random generator, or the seed for it
+        """
+        rng, event_seed = spawn_seeds(rng, 2)
+        super().set_rng(rng)
+        self.event_rng = create_rng(event_seed)
+
+    def get_rng(self):
+        """Get the source of randomness used for the events of the simulation.
+
+        Returns
+        -------
+        numpy.random.Generator
+            The generator spawned for the events if the simulator has been given an `rng`, otherwise the generator of the arrival process (or the `numpy.random` module if the arrival process has no generator either)
+        """
+        if self.event_rng is not None:
+            return self.event_rng
+        return self.arrival_process.get_rng()
+
+    def reset_trace(self):
+        """resets all the historical data to prepare the class for a new simulation with additional functionality added to base class.
+        """
+        super().reset_trace()
+        # the number of instances processing a cold start, and a warm request
+        self.cold_running_count = 0
+        self.warm_running_count = 0
+        # the expiration times of idle instances, oldest (expiring first) on the left
+        self.idle_expirations = deque()
+
+    def get_random_block(self):
+        """Draw a block of random numbers for the next `block_size` events.
+
+        Returns
+        -------
+        list[float], list[float]
+            (exps, unifs) the exponentially distributed (with rate 1) and uniformly distributed random numbers
+        """
+        rng = self.get_rng()
+        return rng.exponential(1, size=self.block_size).tolist(), rng.random(self.block_size).tolist()
+
+    def get_average_lifespan(self):
+        """Get the average lifespan of instances using Little's law, as the time-averaged number of instances divided by the rate at which instances are created.
+
+        Returns
+        -------
+        float
+            The average lifespan
+        """
+        if self.total_cold_count == 0:
+            return np.nan
+        return self.get_average_server_count() * self.get_trace_end() / self.total_cold_count
+
+    def get_lifespan_variance(self):
+        """The lifespans of individual instances are not tracked, so their variance is not available.
+
+        Returns
+        -------
+        float
+            Always `nan`
+        """
+        return np.nan
+
+    def generate_trace(self, debug_print=False, progress=False):
+        """Generate a sample trace.
+
+        Parameters
+        ----------
+        debug_print : bool, optional
+            If True, will print the state of the system before each event, by default False
+        progress : bool, optional
+            Whether or not the progress should be outputted using the `tqdm` library, by default False
+        """
+        pbar = None
+        if progress:
+            pbar = tqdm(total=int(self.max_time))
+        pbar_t_update = 0
+
+        arrival_rate = self.arrival_process.rate
+        warm_rate = self.warm_service_process.rate
+        cold_rate = self.cold_service_process.rate
+        expiration_threshold = self.expiration_threshold
+        max_time = self.max_time
+        maximum_concurrency = self.maximum_concurrency
+        maximum_instances = np.inf if self.maximum_instances is None else self.maximum_instances
+        record_history = self.record_history
+
+        idle_expirations = self.idle_expirations
+        cold_running = self.cold_running_count
+        warm_running = self.warm_running_count
+
+        # running sums, written back to the simulator after the loop
+        req_count = cold_count = warm_count = reject_count = termination_count = 0
+        running_sum = idle_sum = 0
+        if record_history:
+            append_time = self._hist_times.append
+            append_server_count = self._hist_server_count.append
+            append_running_count = self._hist_server_running_count.append
+            append_idle_count = self._hist_server_idle_count.append
+            append_cold_idx = self._hist_req_cold_idxs.append
+            append_warm_idx = self._hist_req_warm_idxs.append
+            append_rej_idx = self._hist_req_rej_idxs.append
+            hist_idx = len(self._hist_times) - 1
+
+        exps, unifs = [], []
+        block_idx = 0
+        t = 0
+        while t < max_time:
+            running = cold_running + warm_running
+            idle_count = len(idle_expirations)
+            if record_history:
+                hist_idx += 1
+                append_time(t)
+                append_server_count(running + idle_count)
+                append_running_count(running)
+                append_idle_count(idle_count)
+            if debug_print:
+                print()
+                print(f"Time: {t:.2f} \t idle/running(cold)/running(warm): \t {idle_count}/{cold_running}/{warm_running}")
+
+            if block_idx == len(exps):
+                exps, unifs = self.get_random_block()
+                block_idx = 0
+                if progress and int(t) > pbar_t_update:
+                    pbar.update(min(int(t), int(max_time)) - pbar_t_update)
+                    pbar_t_update = min(int(t), int(max_time))
+            e = exps[block_idx]
+            u = unifs[block_idx]
+            block_idx += 1
+
+            # competing rates of the arrival and the departures of the running instances
+            cold_departure_rate = cold_running * cold_rate
+            total_rate = arrival_rate + cold_departure_rate + warm_running * warm_rate
+            next_t = t + e / total_rate
+
+            # the next event is an expiration, the sampled time is discarded since the processes are memoryless
+            expiration = idle_count > 0 and idle_expirations[0] <= next_t
+            if expiration:
+                next_t = idle_expirations[0]
+
+            dt = next_t - t
+            running_sum += running * dt
+            idle_sum += idle_count * dt
+            t = next_t
+
+            if expiration:
+                idle_expirations.popleft()
+                termination_count += 1
+                continue
+
+            x = u * total_rate
+            if x < arrival_rate:
+                req_count += 1
+                if idle_count > 0:
+                    # warm start on the most recently used idle instance
+                    if running >= maximum_concurrency:
+                        reject_count += 1
+                        if record_history:
+                            append_rej_idx(hist_idx)
+                    else:
+                        idle_expirations.pop()
+                        warm_running += 1
+                        warm_count += 1
+                        if record_history:
+                            append_warm_idx(hist_idx)
+                elif running >= maximum_concurrency or running >= maximum_instances:
+                    reject_count += 1
+                    if record_history:
+                        append_rej_idx(hist_idx)
+                else:
+                    cold_running += 1
+                    cold_count += 1
+                    if record_history:
+                        append_cold_idx(hist_idx)
+            # a departure, the instance becomes idle and expires after the threshold unless it receives a request
+            elif x < arrival_rate + cold_departure_rate or warm_running == 0:
+                cold_running -= 1
+                idle_expirations.append(t + expiration_threshold)
+            else:
+                warm_running -= 1
+                idle_expirations.append(t + expiration_threshold)
+
+        self.cold_running_count = cold_running
+        self.warm_running_count = warm_running
+        self.running_count = cold_running + warm_running
+        self.idle_count = len(idle_expirations)
+        self.server_count = self.running_count + self.idle_count
+        self.total_req_count += req_count
+        self.total_cold_count += cold_count
+        self.total_warm_count += warm_count
+        self.total_reject_count += reject_count
+        self.lifespan_count += termination_count
+
+        # after the trace loop, append the last time recorded
+        if record_history:
+            self._hist_times.append(t)
+            self.calculate_time_lengths()
+        else:
+            self.online_running_count_sum += running_sum
+            self.online_idle_count_sum += idle_sum
+            self.online_server_count_sum += running_sum + idle_sum
+            self.online_time = t
+            self.online_counts = (self.server_count, self.running_count, self.idle_count)
+        if progress:
+            pbar.update(int(max_time) - pbar_t_update)
+            pbar.close()
+
+
+if __name__ == "__main__":
+    sim = MarkovServerlessSimulator(arrival_rate=0.9, warm_service_rate=1/2.016, cold_service_rate=1/2.163,
+            expiration_threshold=600, max_time=1e6)
+    sim.generate_trace(debug_print=False, progress=True)
+    sim.print_trace_results()
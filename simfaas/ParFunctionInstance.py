@@ -1,4 +1,6 @@
-from simfaas.FunctionInstance import FunctionInstance
+from heapq import heappush, heappop
+
+from simfaas.FunctionInstance import FunctionInstance, COLD, WARM, IDLE, TERM
 
 class ParFunctionInstance(FunctionInstance):
     """ParFunctionInstance aims to simulate the behaviour of a function instance in a serverless platform, with all the internal transitions necessary allowing multiple requests to be parsed. For other input parameters, refer to :class:`~simfaas.FunctionInstance.FunctionInstance`.
@@ -10,6 +12,10 @@ class ParFunctionInstance(FunctionInstance):
     concurrency_value : int
         The number of parallel requests that a single instance can handle.
     """
+    # next_departure is a heap of the departures of the requests being processed, so the soonest one is
+    # next_departure[0], and max_departure caches the latest one, which is the last to leave the heap
+    __slots__ = ('concurrency_value', 'cold_end', 'max_departure')
+
     def __init__(self, concurrency_value, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -17,15 +23,16 @@ class ParFunctionInstance(FunctionInstance):
         self.concurrency_value = concurrency_value
 
     def __str__(self):
-        return f"State: {self.state} \t Cold End: {self.cold_end:8.2f} \t Next Transition: {self.get_next_transition_time():8.2f} \t Termination: {self.next_termination:8.2f} \t Departure: {','.join([f'{s:.2f}' for s in self.next_departure])}"
+        return f"State: {self.state} \t Cold End: {self.cold_end:8.2f} \t Next Transition: {self.get_next_transition_time():8.2f} \t Termination: {self.next_termination:8.2f} \t Departure: {','.join([f'{s:.2f}' for s in sorted(self.next_departure)])}"
 
     def generate_cold_departure(self, t):
         # calculate departure and expected termination on each arrival
         self.cold_end = self.creation_time + self.cold_service_process.generate_trace()
         self.next_departure = [self.cold_end + self.warm_service_process.generate_trace()]
+        self.max_departure = self.next_departure[0]
 
     def update_next_termination(self):
-        self.next_termination = max(self.next_departure) + self.expiration_threshold
+        self.next_termination = self.max_departure + self.expiration_threshold
 
     def _get_running_reqs(self):
         return len(self.next_departure)
@@ -41,18 +48,22 @@ class ParFunctionInstance(FunctionInstance):
         return self._get_running_reqs()
 
     def arrival_transition(self, t):
-        if self.state == 'COLD' or self.state == 'WARM':
+        if self.state_code == COLD or self.state_code == WARM:
             if not self.is_ready():
                 raise Exception('instance is already at full capacity!')
             else:
                 # if arrived before cold start process ends, processing starts after cold start ends
-                self.next_departure += [max(t, self.cold_end) + self.warm_service_process.generate_trace()]
+                departure = max(t, self.cold_end) + self.warm_service_process.generate_trace()
+                heappush(self.next_departure, departure)
+                if departure > self.max_departure:
+                    self.max_departure = departure
                 self.update_next_termination()
 
-        elif self.state == 'IDLE':
-            self.state = 'WARM'
+        elif self.state_code == IDLE:
+            self.state_code = WARM
             self.is_busy = True
             self.next_departure = [t + self.warm_service_process.generate_trace()]
+            self.max_departure = self.next_departure[0]
             self.update_next_termination()
 
     def is_ready(self):
@@ -60,25 +71,24 @@ class ParFunctionInstance(FunctionInstance):
 
     def make_transition(self):
         # next transition is a departure
-        if self.state == 'COLD':
-            self.state = 'WARM'
+        if self.state_code == COLD:
+            self.state_code = WARM
             self.is_cold = False
 
-        elif self.state == 'WARM':
+        elif self.state_code == WARM:
             if self._get_running_reqs() > 1:
-                idxmin = self.next_departure.index(min(self.next_departure))
-                del self.next_departure[idxmin]
+                heappop(self.next_departure)
             elif self._get_running_reqs() == 1:
                 # if only 1 request, then we go to idle mode
-                del self.next_departure[0]
-                self.state = 'IDLE'
+                heappop(self.next_departure)
+                self.state_code = IDLE
                 self.is_busy = False
             else:
                 raise Exception("Invalid state!")
 
         # next transition is a termination
-        elif self.state == 'IDLE':
-            self.state = 'TERM'
+        elif self.state_code == IDLE:
+            self.state_code = TERM
             self.is_busy = False
 
         # if terminated
@@ -89,14 +99,22 @@ class ParFunctionInstance(FunctionInstance):
 
     def get_next_transition_time(self, t=0):
         # next transition would be termination
-        if self.state == 'IDLE':
+        if self.state_code == IDLE:
             return self.get_next_termination(t)
-        elif self.state == 'COLD':
+        elif self.state_code == COLD:
             return self.cold_end - t
         # next transition would be departure
         return self.get_next_departure(t)
 
+    def get_next_event_time(self):
+        if self.state_code == IDLE:
+            return self.next_termination
+        elif self.state_code == COLD:
+            return self.cold_end
+        return self.next_departure[0]
+
     def get_next_departure(self, t):
-        if t > min(self.next_departure):
+        next_departure = self.next_departure[0]
+        if t > next_departure:
             raise Exception("current time is after departure!")
-        return min(self.next_departure) - t
+        return next_departure - t
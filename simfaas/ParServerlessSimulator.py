@@ -1,52 +1,111 @@
 # The main simulator for serverless computing platforms
 
-import numpy as np
-
 from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.FunctionInstance import TERM
 from simfaas.ParFunctionInstance import ParFunctionInstance
+from simfaas.HistoryBuffer import HistoryBuffer
 
 class ParServerlessSimulator(ServerlessSimulator):
-    """ParServerlessSimulator is responsible for executing simulations of a sample serverless computing platform with the ability to handle concurrent request in each instance, mainly for the performance analysis and performance model evaluation purposes. For parameters, refer to :class:`~simfaas.ServerlessSimulator.ServerlessSimulator`.
+    """ParServerlessSimulator is responsible for executing simulations of a sample serverless computing platform with the ability to handle concurrent request in each instance, mainly for the performance analysis and performance model evaluation purposes. For parameters, refer to :class:`~simfaas.ServerlessSimulator.ServerlessSimulator`. Note that `maximum_concurrency` limits the number of requests being processed by all instances, not the number of running instances, use `maximum_instances` to limit the number of instances.
 
     Parameters
     ----------
     concurrency_value : int
         The number of concurrent requests allowed for each function instance.
+    conc_snapshot_interval : float, optional
+        If present, the concurrency level of every instance is recorded in `hist_conc_levels` (with the times in `hist_conc_times`) at most once every `conc_snapshot_interval` units of time (0 records them on every event), by default None which does not record them, since their memory usage grows with both the number of events and instances
     """
-    def __init__(self, concurrency_value: int, *args, **kwargs):
+    # the per-instance concurrency levels (hist_conc_levels) are not stored in saved traces
+    trace_columns = ServerlessSimulator.trace_columns + ('hist_conc_avgs',)
+    trace_attributes = ServerlessSimulator.trace_attributes + ('concurrency_value',)
+
+    def __init__(self, concurrency_value: int, *args, conc_snapshot_interval=None, **kwargs):
+        self.conc_snapshot_interval = conc_snapshot_interval
         super().__init__(*args, **kwargs)
         self.concurrency_value = concurrency_value
 
-    def cold_start_arrival(self, t):
-        """Goes through the process necessary for a cold start arrival which includes generation of a new function instance in the `COLD` state and adding it to the cluster.
+    def create_instance(self, t):
+        """Create a new function instance for a cold start arrival that is able to process concurrent requests.
 
         Parameters
         ----------
         t : float
-            The time at which the arrival has happened. This is used to record the creation time for the server and schedule the expiration of the instance if necessary.
-        """
-        self.total_req_count += 1
-
-        # reject request if maximum concurrency reached
-        if self.running_count == self.maximum_concurrency:
-            self.total_reject_count += 1
-            self.hist_req_rej_idxs.append(len(self.hist_times) - 1)
-            return
+            The time at which the instance is being created
 
-        self.total_cold_count += 1
-        self.hist_req_cold_idxs.append(len(self.hist_times) - 1)
-
-        self.server_count += 1
-        self.running_count += 1
-        new_server = ParFunctionInstance(self.concurrency_value, t, self.cold_service_process, self.warm_service_process, self.expiration_threshold)
-        self.servers.append(new_server)
+        Returns
+        -------
+        simfaas.ParFunctionInstance.ParFunctionInstance
+            The newly created function instance
+        """
+        return ParFunctionInstance(self.concurrency_value, t, self.cold_service_process, self.warm_service_process, self.expiration_threshold)
 
     def reset_trace(self):
         """resets all the historical data to prepare the class for a new simulation with additional functionality added to base class.
         """
         super().reset_trace()
+        # the number of requests being processed by all instances, and by each instance, updated on each transition
+        self.inflight_count = 0
+        self.instance_concurrency = {}
+        # optional snapshots of the concurrency level of every instance
+        self.hist_conc_times = []
         self.hist_conc_levels = []
-        self.hist_conc_avgs = []
+        self._hist_conc_avgs = HistoryBuffer(float)
+        # running sums used instead of the history when record_history is False
+        self.online_conc_avg = -1
+        self.online_conc_sum = 0
+        self.online_conc_time = 0
+
+    @property
+    def hist_conc_avgs(self):
+        """numpy.ndarray: The average concurrency level among instances after each event, -1 if there are no instances"""
+        return self._hist_conc_avgs.view()
+
+    def build_event_queue(self):
+        """Build the event queue and the scheduler data structures from scratch, and recalculate the number of requests being processed by the instances.
+        """
+        self.inflight_count = 0
+        self.instance_concurrency = {}
+        super().build_event_queue()
+
+    def update_instance(self, instance, t):
+        """Update the number of requests being processed, the event queue, and the scheduler after an instance has made a transition.
+
+        Parameters
+        ----------
+        instance : simfaas.ParFunctionInstance.ParFunctionInstance
+            The instance that has made a transition
+        t : float
+            Current time
+        """
+        if instance.state_code == TERM:
+            self.inflight_count -= self.instance_concurrency.pop(instance, 0)
+        else:
+            conc = instance.get_concurrency()
+            self.inflight_count += conc - self.instance_concurrency.get(instance, 0)
+            self.instance_concurrency[instance] = conc
+        super().update_instance(instance, t)
+
+    def get_inflight_count(self):
+        """Get the number of requests being processed by all instances, which is compared against `maximum_concurrency`.
+
+        Returns
+        -------
+        int
+            The number of requests being processed
+        """
+        return self.inflight_count
+
+    def get_conc_level_avg(self):
+        """Get the current average concurrency level among instances.
+
+        Returns
+        -------
+        float
+            The average number of requests being processed by each instance, -1 if there are no instances
+        """
+        if len(self.servers) == 0:
+            return -1
+        return self.inflight_count / len(self.servers)
 
     def update_hist_arrays(self, t):
         """Update history arrays
@@ -57,15 +116,28 @@ class ParServerlessSimulator(ServerlessSimulator):
             Current time
         """
         super().update_hist_arrays(t)
-        conc_levels = [s.get_concurrency() for s in self.servers]
-        self.hist_conc_levels.append(conc_levels)
+        self._hist_conc_avgs.append(self.get_conc_level_avg())
 
-        if len(conc_levels) > 0:
-            conc_level_avg = np.mean(conc_levels)
-        else:
-            conc_level_avg = -1
+        interval = self.conc_snapshot_interval
+        if interval is not None:
+            if len(self.hist_conc_times) == 0 or t - self.hist_conc_times[-1] >= interval:
+                self.hist_conc_times.append(t)
+                self.hist_conc_levels.append([s.get_concurrency() for s in self.servers])
+
+    def update_online_stats(self, t):
+        """Update the running time-weighted sums, used instead of the history arrays when `record_history` is False.
 
-        self.hist_conc_avgs.append(conc_level_avg)
+        Parameters
+        ----------
+        t : float
+            Current time
+        """
+        time_length = t - self.online_time
+        if self.online_conc_avg * time_length > 0:
+            self.online_conc_sum += self.online_conc_avg * time_length
+            self.online_conc_time += time_length
+        super().update_online_stats(t)
+        self.online_conc_avg = self.get_conc_level_avg()
 
     def get_average_conc_avgs(self):
         """Get the time-averaged average concurrency levels among all instances.
@@ -75,10 +147,18 @@ class ParServerlessSimulator(ServerlessSimulator):
         float
             Average concurrency levels of instances
         """
-        avg_conc = (self.hist_conc_avgs * self.time_lengths)
-        idxs = avg_conc > 0
-        avg_conc = avg_conc[idxs].sum() / self.time_lengths[idxs].sum()
-        return avg_conc
+        if not self.record_history:
+            return self.online_conc_sum / self.online_conc_time
+        # only the times at which there are instances are included, processed in chunks like other time averages
+        hist_conc_avgs = self.hist_conc_avgs
+        conc_sum = 0
+        conc_time = 0
+        for chunk_start, chunk_stop, time_lengths in self.get_window().iter_chunks():
+            avg_conc = hist_conc_avgs[chunk_start:chunk_stop] * time_lengths
+            idxs = avg_conc > 0
+            conc_sum += avg_conc[idxs].sum()
+            conc_time += time_lengths[idxs].sum()
+        return conc_sum / conc_time
 
     
     def get_result_dict(self):
@@ -105,6 +185,31 @@ class ParServerlessSimulator(ServerlessSimulator):
         # average concurrency value
         print(f"Average Concurrency Value: \t {self.get_average_conc_avgs():.4f}")
     
+    def get_warm_capacity(self):
+        """Get the number of requests that can be accepted by the instances that are ready, which is the number of free slots over all instances.
+
+        Returns
+        -------
+        int
+            The number of requests that can start warm
+        """
+        return len(self.servers) * self.concurrency_value - self.inflight_count
+
+    def get_free_slots(self, instance):
+        """Get the number of requests that an instance can accept right now.
+
+        Parameters
+        ----------
+        instance : simfaas.ParFunctionInstance.ParFunctionInstance
+            The instance
+
+        Returns
+        -------
+        int
+            The number of free slots of the instance
+        """
+        return self.concurrency_value - instance.get_concurrency()
+
     def is_warm_available(self, t):
         """Whether we have at least one available instance in the warm pool that can process requests
 
@@ -118,11 +223,8 @@ class ParServerlessSimulator(ServerlessSimulator):
         bool
             True if at least one server is able to accept a request
         """
-        for s in self.servers:
-            if s.is_ready():
-                return True
-
-        return False
+        # the scheduler holds exactly the instances with a free slot, kept up to date by update_instance
+        return len(self.scheduler) > 0
 
     
         
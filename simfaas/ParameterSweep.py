@@ -0,0 +1,242 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.ReplicationRunner import run_replication
+from simfaas.Utility import spawn_seeds
+
+
+def run_sweep_chunk(simulator_class, points):
+    """Run a chunk of parameter sweep points, defined on the module level so it can be sent to worker processes.
+
+    Parameters
+    ----------
+    simulator_class : type
+        The simulator class, e.g. :class:`~simfaas.ServerlessSimulator.ServerlessSimulator`
+    points : list[tuple]
+        A list of `(index, simulator_kwargs, seed)` tuples, `record_history` is False unless specified in the arguments
+
+    Returns
+    -------
+    list[tuple]
+        A list of `(index, results)` tuples, where results is the result dict of the simulator
+    """
+    return [(idx, run_replication(simulator_class, {'record_history': False, **kwargs}, seed)) for idx, kwargs, seed in points]
+
+
+def _to_builtin(value):
+    # numpy scalars are not json serializable
+    if isinstance(value, np.generic):
+        return value.item()
+    return repr(value)
+
+
+class ParameterSweep:
+    """ParameterSweep runs a simulation for each point in a grid of parameters on a pool of worker processes. Points
+are sent to the workers in chunks and the results are streamed back as they complete. If `cache_dir` is set and
+a `seed` is given, the result of each point is stored on disk, keyed by the hash of the parameters and the seed, and
+is loaded instead of being simulated again when the same point is requested later.
+
+    Parameters
+    ----------
+    grid : dict, list[dict]
+        Either a dict mapping simulator arguments to a list of values (scalar values are shared by all points), which
+        is expanded into the cartesian product of the values, or a list of dicts each holding the arguments of a point.
+        Arguments should be json serializable for the cache to work. `record_history` is False unless specified,
+        since only the result dict is needed.
+    simulator_class : type, optional
+        The simulator class, by default :class:`~simfaas.ServerlessSimulator.ServerlessSimulator`
+    seed : int, optional
+        The root seed, the seed of each point is derived from it and the parameters of the point, so the result
+        of a point does not depend on the other points of the sweep, by default None which takes fresh entropy from
+        the operating system, and spawns an independent seed for each point from it (results are not cached)
+    cache_dir : str, optional
+        The directory used to cache the results, by default None which disables caching
+    max_workers : int, optional
+        The number of worker processes, if 1, points are simulated in the current process, by default None which
+        uses the number of processors on the machine
+    chunksize : int, optional
+        The number of points sent to a worker at once, by default 1
+    """
+    def __init__(self, grid, simulator_class=ServerlessSimulator, seed=None, cache_dir=None, max_workers=None,
+                 chunksize=1):
+        super().__init__()
+
+        self.points = self.expand_grid(grid)
+        self.simulator_class = simulator_class
+        self.seed = seed
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        # root for the seeds of the points when no seed is given, so workers do not share the global random state
+        self.seed_sequence = spawn_seeds(None, 1)[0] if seed is None else None
+
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def expand_grid(grid):
+        """Expand a grid of parameters into a list of points.
+
+        Parameters
+        ----------
+        grid : dict, list[dict]
+            A dict of lists of values (scalars are shared by all points), or a list of dicts
+
+        Returns
+        -------
+        list[dict]
+            The list of points
+        """
+        if not isinstance(grid, dict):
+            return [dict(p) for p in grid]
+
+        keys = list(grid.keys())
+        values = [v if isinstance(v, (list, tuple, np.ndarray)) else [v] for v in grid.values()]
+        return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+
+    def get_point_hash(self, point):
+        """Get the hash of a point, used for deriving its seed and as its key in the cache.
+
+        Parameters
+        ----------
+        point : dict
+            The simulator arguments of the point
+
+        Returns
+        -------
+        str
+            The hex digest of the hash
+        """
+        desc = {
+            'simulator': f"{self.simulator_class.__module__}.{self.simulator_class.__qualname__}",
+            'params': point,
+            'seed': self.seed,
+        }
+        desc = json.dumps(desc, sort_keys=True, default=_to_builtin)
+        return hashlib.sha256(desc.encode('utf-8')).hexdigest()
+
+    def get_point_seed(self, point_hash):
+        """Get the seed of a point.
+
+        Parameters
+        ----------
+        point_hash : str
+            The hash of the point
+
+        Returns
+        -------
+        numpy.random.SeedSequence
+            The seed of the point, a fresh seed spawned from `seed_sequence` if the sweep has no seed
+        """
+        if self.seed is None:
+            return self.seed_sequence.spawn(1)[0]
+        return np.random.SeedSequence([self.seed, int(point_hash[:16], 16)])
+
+    def get_cache_path(self, point_hash):
+        """Get the path of the cache file of a point.
+
+        Parameters
+        ----------
+        point_hash : str
+            The hash of the point
+
+        Returns
+        -------
+        str
+            The path of the cache file
+        """
+        return os.path.join(self.cache_dir, f"{point_hash}.json")
+
+    def load_cached(self, point_hash):
+        """Load the result of a point from the cache.
+
+        Parameters
+        ----------
+        point_hash : str
+            The hash of the point
+
+        Returns
+        -------
+        dict
+            The cached result, or None if not cached
+        """
+        if self.cache_dir is None or self.seed is None:
+            return None
+        path = self.get_cache_path(point_hash)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def store_cached(self, point_hash, result):
+        """Store the result of a point in the cache, does nothing if caching is disabled.
+
+        Parameters
+        ----------
+        point_hash : str
+            The hash of the point
+        result : dict
+            The result dict of the simulator
+        """
+        if self.cache_dir is None or self.seed is None:
+            return
+        path = self.get_cache_path(point_hash)
+        # write to a temporary file first, so a partially written file is never read
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f, default=_to_builtin)
+        os.replace(tmp_path, path)
+
+    def iter_results(self):
+        """Run the sweep, yielding the result of each point as soon as it is available (cached points first).
+
+        Yields
+        -------
+        (int, dict)
+            The index of the point and its row, which holds the simulator arguments updated with the results
+        """
+        pending = []
+        hashes = {}
+        for idx, point in enumerate(self.points):
+            point_hash = self.get_point_hash(point)
+            cached = self.load_cached(point_hash)
+            if cached is not None:
+                yield idx, {**point, **cached}
+            else:
+                hashes[idx] = point_hash
+                pending.append((idx, point, self.get_point_seed(point_hash)))
+
+        chunks = [pending[i:i + self.chunksize] for i in range(0, len(pending), self.chunksize)]
+        if self.max_workers == 1:
+            completed = (run_sweep_chunk(self.simulator_class, c) for c in chunks)
+            for chunk_results in completed:
+                yield from self._finish_chunk(chunk_results, hashes)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(run_sweep_chunk, self.simulator_class, c) for c in chunks]
+            for future in as_completed(futures):
+                yield from self._finish_chunk(future.result(), hashes)
+
+    def _finish_chunk(self, chunk_results, hashes):
+        for idx, result in chunk_results:
+            self.store_cached(hashes[idx], result)
+            yield idx, {**self.points[idx], **result}
+
+    def run(self):
+        """Run the sweep and collect the results.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per point in the order of the points, holding the simulator arguments and the results
+        """
+        rows = dict(self.iter_results())
+        return pd.DataFrame([rows[idx] for idx in range(len(self.points))])
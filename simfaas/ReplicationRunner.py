@@ -0,0 +1,175 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t as student_t
+
+from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.Utility import spawn_seeds
+
+
+def run_replication(simulator_class, simulator_kwargs, seed):
+    """Run a single replication of the simulation, defined on the module level so it can be sent to worker processes.
+
+    Parameters
+    ----------
+    simulator_class : type
+        The simulator class, e.g. :class:`~simfaas.ServerlessSimulator.ServerlessSimulator`
+    simulator_kwargs : dict
+        The arguments passed to the simulator
+    seed : numpy.random.SeedSequence
+        The seed used for the random streams of the simulator
+
+    Returns
+    -------
+    dict
+        The results of the replication, from :func:`~simfaas.ServerlessSimulator.ServerlessSimulator.get_result_dict`
+    """
+    sim = simulator_class(**simulator_kwargs, rng=seed)
+    sim.generate_trace(debug_print=False, progress=False)
+    return sim.get_result_dict()
+
+
+class ReplicationRunner:
+    """ReplicationRunner runs independent replications of a simulation on a pool of worker processes and aggregates
+the results into means, standard deviations, and t-based confidence intervals. Each replication gets its own seed
+spawned from `seed`, so the replications are independent, and the results are reproducible.
+
+    Parameters
+    ----------
+    simulator_kwargs : dict
+        The arguments used to create the simulator for each replication (except `rng`, which is set by the runner),
+        `record_history` is False unless specified, since only the result dict is needed
+    simulator_class : type, optional
+        The simulator class, by default :class:`~simfaas.ServerlessSimulator.ServerlessSimulator`
+    seed : int, numpy.random.SeedSequence, numpy.random.Generator, optional
+        The root seed for the replications, by default None which takes fresh entropy from the operating system
+    max_workers : int, optional
+        The number of worker processes, if 1, replications run in the current process, by default None which
+        uses the number of processors on the machine
+    """
+    def __init__(self, simulator_kwargs, simulator_class=ServerlessSimulator, seed=None, max_workers=None):
+        super().__init__()
+
+        self.simulator_kwargs = {'record_history': False, **simulator_kwargs}
+        self.simulator_class = simulator_class
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # successive calls to spawn() give new, independent children
+        self.seed_sequence = spawn_seeds(seed, 1)[0]
+        self.results = []
+
+    def run(self, num_replications, executor=None):
+        """Run `num_replications` more replications and add them to the results.
+
+        Parameters
+        ----------
+        num_replications : int
+            The number of replications
+        executor : concurrent.futures.Executor, optional
+            The executor used to run the replications, by default None which creates a new pool for this call
+
+        Returns
+        -------
+        list[dict]
+            The results of the new replications, in the order of their seeds
+        """
+        seeds = self.seed_sequence.spawn(num_replications)
+        n = len(seeds)
+        args = ([self.simulator_class] * n, [self.simulator_kwargs] * n, seeds)
+
+        if executor is not None:
+            results = list(executor.map(run_replication, *args))
+        elif self.max_workers == 1:
+            results = list(map(run_replication, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(run_replication, *args))
+
+        self.results += results
+        return results
+
+    def run_until(self, metric='prob_cold', half_width=0.01, confidence=0.95, min_replications=10,
+                  max_replications=1000):
+        """Keep running replications until the half-width of the confidence interval of `metric` falls below
+`half_width`. Replications are run in batches of `max_workers` so that all workers are kept busy, and every
+replication that is run is included in the results.
+
+        Parameters
+        ----------
+        metric : str, optional
+            The key in the result dict of the simulator, by default 'prob_cold'
+        half_width : float, optional
+            The target half-width of the confidence interval, by default 0.01
+        confidence : float, optional
+            The confidence level, by default 0.95
+        min_replications : int, optional
+            The minimum number of replications before checking the stopping rule, by default 10
+        max_replications : int, optional
+            The maximum number of replications, by default 1000
+
+        Returns
+        -------
+        pandas.DataFrame
+            The summary of the results, from :func:`~simfaas.ReplicationRunner.ReplicationRunner.get_summary`
+        """
+        executor = None
+        if self.max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        try:
+            while len(self.results) < max_replications:
+                remaining = max_replications - len(self.results)
+                batch_size = max(self.max_workers, min_replications - len(self.results))
+                self.run(min(batch_size, remaining), executor=executor)
+
+                if len(self.results) < min_replications:
+                    continue
+                summary = self.get_summary(confidence=confidence)
+                if summary.loc[metric, 'half_width'] < half_width:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return self.get_summary(confidence=confidence)
+
+    def get_results_df(self):
+        """Get the results of all replications run so far.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per replication, one column per key in the result dict
+        """
+        return pd.DataFrame(self.results)
+
+    def get_summary(self, confidence=0.95):
+        """Get the mean, standard deviation, and t-based confidence interval of each result over the replications.
+Replications where a result is not defined (NaN, e.g. average lifespan when no instance has expired) are
+ignored for that result.
+
+        Parameters
+        ----------
+        confidence : float, optional
+            The confidence level, by default 0.95
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per result, with columns `count`, `mean`, `std`, `half_width`, `ci_low` and `ci_high`
+        """
+        df = self.get_results_df().select_dtypes(include=[np.number])
+
+        summary = pd.DataFrame({
+            'count': df.count(),
+            'mean': df.mean(),
+            'std': df.std(ddof=1),
+        })
+        counts = summary['count'].to_numpy(dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t_values = student_t.ppf((1 + confidence) / 2, counts - 1)
+            summary['half_width'] = t_values * summary['std'] / np.sqrt(counts)
+        summary['ci_low'] = summary['mean'] - summary['half_width']
+        summary['ci_high'] = summary['mean'] + summary['half_width']
+        return summary
@@ -0,0 +1,316 @@
+import numpy as np
+
+from simfaas.InstanceQueue import InstanceQueue
+from simfaas.Utility import create_rng
+
+
+class Scheduler:
+    """Scheduler gives us a single interface for the policies used to select the warm instance that processes an
+incoming request. The simulator keeps the scheduler informed about the instances that are ready to accept requests
+by calling :func:`~simfaas.Scheduler.Scheduler.add` when an instance becomes ready,
+:func:`~simfaas.Scheduler.Scheduler.update` when a ready instance makes a transition and is still ready, and
+:func:`~simfaas.Scheduler.Scheduler.remove` when an instance is no longer ready. This way, each policy can keep its own
+data structure of candidates and the selection does not need to go through all of the instances. For batch arrivals,
+:func:`~simfaas.Scheduler.Scheduler.select_many` selects the instances for all the requests in the batch at once.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used by randomized policies, by default None
+        which uses the global numpy random state
+    """
+    def __init__(self, rng=None):
+        super().__init__()
+        self.instance_ids = {}
+        self.set_rng(rng)
+
+    def set_rng(self, rng=None):
+        """Set the source of randomness used by randomized policies.
+
+        Parameters
+        ----------
+        rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            The random generator (or the seed for creating one), by default None which uses the global numpy random state
+        """
+        self.rng = create_rng(rng)
+
+    def get_rng(self):
+        """Get the source of randomness used by randomized policies.
+
+        Returns
+        -------
+        numpy.random.Generator
+            The random generator of this scheduler, or the `numpy.random` module if no generator is set
+        """
+        if self.rng is None:
+            return np.random
+        return self.rng
+
+    def reset(self, simulator):
+        """Prepare the scheduler for a new trace, called by the simulator before any instance is added.
+
+        Parameters
+        ----------
+        simulator : simfaas.ServerlessSimulator.ServerlessSimulator
+            The simulator using this scheduler
+        """
+        # ids are given by the simulator in order of creation, used for breaking ties
+        self.instance_ids = simulator.instance_ids
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __contains__(self, instance):
+        raise NotImplementedError
+
+    def add(self, instance, t):
+        """Add an instance that has just become ready to accept requests.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance that is ready
+        t : float
+            Current time
+        """
+        raise NotImplementedError
+
+    def update(self, instance, t):
+        """Update an instance that has made a transition and is still ready to accept requests, by default does nothing.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance that has made a transition
+        t : float
+            Current time
+        """
+        pass
+
+    def remove(self, instance):
+        """Remove an instance which is no longer ready to accept requests, does nothing if the instance is not present.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance to be removed
+        """
+        raise NotImplementedError
+
+    def select(self, t):
+        """Select the instance that should process the incoming request.
+
+        Parameters
+        ----------
+        t : float
+            Current time
+
+        Returns
+        -------
+        simfaas.FunctionInstance.FunctionInstance
+            The selected instance, or None if there are no ready instances
+        """
+        raise NotImplementedError
+
+    def select_many(self, t, count, get_free_slots=None):
+        """Select the instances that should process `count` incoming requests arriving at once, in the order they
+should be filled. Instances are selected until their free slots cover all the requests, or there are no ready
+instances left. The selected instances are removed from the scheduler, and the simulator adds them back
+(through :func:`~simfaas.ServerlessSimulator.ServerlessSimulator.update_instance`) once the requests are assigned.
+By default, this selects the instances one by one using :func:`~simfaas.Scheduler.Scheduler.select`, policies
+can override it with a faster way of selecting several instances.
+
+        Parameters
+        ----------
+        t : float
+            Current time
+        count : int
+            The number of requests
+        get_free_slots : callable, optional
+            A function giving the number of requests an instance can accept, by default None which assumes one
+            request per instance
+
+        Returns
+        -------
+        list[simfaas.FunctionInstance.FunctionInstance]
+            The selected instances
+        """
+        instances = []
+        while count > 0:
+            instance = self.select(t)
+            if instance is None:
+                break
+            self.remove(instance)
+            instances.append(instance)
+            count -= 1 if get_free_slots is None else get_free_slots(instance)
+        return instances
+
+
+class QueueScheduler(Scheduler):
+    """QueueScheduler extends the functionality of :class:`~simfaas.Scheduler.Scheduler` for policies that select the
+instance with the smallest key, using a :class:`~simfaas.InstanceQueue.InstanceQueue`. Child classes only need to
+implement :func:`~simfaas.Scheduler.QueueScheduler.get_key`, and set `self.dynamic_key` if the key of an instance
+can change while it is ready.
+    """
+    def __init__(self, rng=None):
+        super().__init__(rng=rng)
+        self.queue = InstanceQueue()
+        self.dynamic_key = False
+
+    def reset(self, simulator):
+        super().reset(simulator)
+        self.queue = InstanceQueue()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __contains__(self, instance):
+        return instance in self.queue
+
+    def get_key(self, instance, t):
+        """Get the key of the instance, the instance with the smallest key is selected.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance
+        t : float
+            Current time
+
+        Returns
+        -------
+        tuple
+            The key of the instance, ending with the instance id to break ties
+        """
+        raise NotImplementedError
+
+    def add(self, instance, t):
+        self.queue.push(instance, self.get_key(instance, t))
+
+    def update(self, instance, t):
+        if self.dynamic_key:
+            self.queue.push(instance, self.get_key(instance, t))
+
+    def remove(self, instance):
+        self.queue.remove(instance)
+
+    def select(self, t):
+        return self.queue.peek()
+
+    def select_many(self, t, count, get_free_slots=None):
+        # the instances with the smallest keys, popped from the queue
+        instances = []
+        queue = self.queue
+        while count > 0:
+            instance = queue.pop()
+            if instance is None:
+                break
+            instances.append(instance)
+            count -= 1 if get_free_slots is None else get_free_slots(instance)
+        return instances
+
+
+class NewestFirstScheduler(QueueScheduler):
+    """NewestFirstScheduler selects the ready instance that has been created most recently, which is the default
+policy used by the simulators.
+    """
+    def get_key(self, instance, t):
+        return (-instance.creation_time, self.instance_ids[instance])
+
+
+class OldestFirstScheduler(QueueScheduler):
+    """OldestFirstScheduler selects the ready instance that has been created before all other ready instances.
+    """
+    def get_key(self, instance, t):
+        return (instance.creation_time, self.instance_ids[instance])
+
+
+class LRUScheduler(QueueScheduler):
+    """LRUScheduler selects the least recently used instance, e.g. the ready instance whose last transition (receiving
+or finishing a request) happened before all other ready instances.
+    """
+    def __init__(self, rng=None):
+        super().__init__(rng=rng)
+        self.dynamic_key = True
+
+    def get_key(self, instance, t):
+        return (t, self.instance_ids[instance])
+
+
+class MRUScheduler(QueueScheduler):
+    """MRUScheduler selects the most recently used instance, e.g. the ready instance whose last transition (receiving
+or finishing a request) happened after all other ready instances. For instances processing one request at a time, the
+ready instances then form a stack where the instance that has been idle the longest expires first, which is the policy
+used by :class:`~simfaas.MarkovServerlessSimulator.MarkovServerlessSimulator`.
+    """
+    def __init__(self, rng=None):
+        super().__init__(rng=rng)
+        self.dynamic_key = True
+
+    def get_key(self, instance, t):
+        return (-t, -self.instance_ids[instance])
+
+
+class LeastLoadedScheduler(QueueScheduler):
+    """LeastLoadedScheduler selects the ready instance with the least number of requests being processed, which is
+meant to be used with :class:`~simfaas.ParServerlessSimulator.ParServerlessSimulator`.
+    """
+    def __init__(self, rng=None):
+        super().__init__(rng=rng)
+        self.dynamic_key = True
+
+    def get_key(self, instance, t):
+        return (instance.get_concurrency(), self.instance_ids[instance])
+
+
+class BinPackingScheduler(QueueScheduler):
+    """BinPackingScheduler selects the ready instance with the most number of requests being processed, packing the
+requests into as few instances as possible so the rest of the instances can expire. This policy is meant to be used
+with :class:`~simfaas.ParServerlessSimulator.ParServerlessSimulator`.
+    """
+    def __init__(self, rng=None):
+        super().__init__(rng=rng)
+        self.dynamic_key = True
+
+    def get_key(self, instance, t):
+        return (-instance.get_concurrency(), self.instance_ids[instance])
+
+
+class RandomScheduler(Scheduler):
+    """RandomScheduler selects one of the ready instances uniformly at random. The ready instances are kept in a list
+along with the position of each instance, which allows constant time addition, removal, and selection.
+    """
+    def __init__(self, rng=None):
+        super().__init__(rng=rng)
+        self.instances = []
+        self.positions = {}
+
+    def reset(self, simulator):
+        super().reset(simulator)
+        self.instances = []
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.instances)
+
+    def __contains__(self, instance):
+        return instance in self.positions
+
+    def add(self, instance, t):
+        self.positions[instance] = len(self.instances)
+        self.instances.append(instance)
+
+    def remove(self, instance):
+        pos = self.positions.pop(instance, None)
+        if pos is None:
+            return
+        # move the last instance into the position of the removed one
+        last = self.instances.pop()
+        if last is not instance:
+            self.instances[pos] = last
+            self.positions[last] = pos
+
+    def select(self, t):
+        if len(self.instances) == 0:
+            return None
+        return self.instances[int(self.get_rng().random() * len(self.instances))]
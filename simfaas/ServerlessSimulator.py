@@ -1,9 +1,16 @@
 # The main simulator for serverless computing platforms
 
 from simfaas.SimProcess import ExpSimProcess
-from simfaas.FunctionInstance import FunctionInstance
+from simfaas.FunctionInstance import FunctionInstance, IDLE, TERM
+from simfaas.InstanceQueue import InstanceQueue
+from simfaas.HistoryBuffer import HistoryBuffer
+from simfaas.Scheduler import NewestFirstScheduler
+from simfaas.HistoryWindow import HistoryWindow
+from simfaas.Utility import spawn_seeds
+import json
+import os
+
 import numpy as np
-import pandas as pd
 
 from tqdm import tqdm
 
@@ -23,7 +30,15 @@ class ServerlessSimulator:
     max_time : float, optional
         The maximum amount of time for which the simulation should continue, by default 24*60*60 (24 hours)
     maximum_concurrency : int, optional
-        The maximum number of concurrently executing function instances allowed on the system This will be used to determine when a rejection of request should happen due to lack of capacity, by default 1000
+        The maximum number of requests being processed concurrently on the system (for instances processing one request at a time, the number of running instances). This will be used to determine when a rejection of request should happen due to lack of capacity, by default 1000
+    maximum_instances : int, optional
+        The maximum number of function instances (running or idle) allowed on the system, a cold start arrival is rejected when this limit is reached, by default None which means no limit
+    scheduler : simfaas.Scheduler.Scheduler, optional
+        The policy used to select the warm instance that processes each request, by default :class:`~simfaas.Scheduler.NewestFirstScheduler`
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        If present, independent random streams are spawned from it and set for the arrival, warm service, and cold service processes and the scheduler, which makes the simulation reproducible without touching the global numpy random state. Note that this replaces the random streams of the processes passed in. By default None, which leaves the processes as they are.
+    record_history : bool, optional
+        Whether or not the history of events (`hist_*` arrays) and the terminated instances (`prev_servers`) should be recorded. If False, only running sums needed for :func:`~simfaas.ServerlessSimulator.ServerlessSimulator.get_result_dict` are kept, which keeps the memory usage independent of `max_time`, but the methods analyzing the history are not available, by default True
 
     Raises
     ------
@@ -36,9 +51,19 @@ class ServerlessSimulator:
     ValueError
         Raises if warm_service_rate is smaller than cold_service_rate
     """
+    # the history arrays stored by save_trace, each one kept in a HistoryBuffer with the same name and a leading underscore
+    trace_columns = ('hist_times', 'hist_server_count', 'hist_server_running_count', 'hist_server_idle_count',
+                     'hist_req_cold_idxs', 'hist_req_warm_idxs', 'hist_req_rej_idxs', 'hist_lifespans')
+    # the number of events processed at once by the analysis methods, which bounds their memory usage
+    analysis_chunk_size = 1 << 20
+    # the parameters and totals stored in the metadata of saved traces
+    trace_attributes = ('expiration_threshold', 'max_time', 'maximum_concurrency', 'maximum_instances', 'total_req_count',
+                        'total_cold_count', 'total_warm_count', 'total_reject_count', 'lifespan_count',
+                        'lifespan_mean', 'lifespan_m2')
+
     def __init__(self, arrival_process=None, warm_service_process=None, 
             cold_service_process=None, expiration_threshold=600, max_time=24*60*60,
-            maximum_concurrency=1000, **kwargs):
+            maximum_concurrency=1000, maximum_instances=None, scheduler=None, rng=None, record_history=True, **kwargs):
         super().__init__()
         
         # setup arrival process
@@ -75,10 +100,35 @@ class ServerlessSimulator:
         self.expiration_threshold = expiration_threshold
         self.max_time = max_time
         self.maximum_concurrency = maximum_concurrency
+        self.maximum_instances = maximum_instances
+        self.record_history = record_history
+
+        # setup the scheduling policy for warm instances
+        self.scheduler = scheduler
+        if self.scheduler is None:
+            self.scheduler = NewestFirstScheduler()
+
+        # give each process an independent random stream
+        if rng is not None:
+            self.set_rng(rng)
 
         # reset trace values
         self.reset_trace()
 
+    def set_rng(self, rng):
+        """Spawn independent random streams from `rng` and set them for the arrival, warm service, and cold service processes and the scheduler.
+
+        Parameters
+        ----------
+        rng : numpy.random.Generator, int, numpy.random.SeedSequence
+            The root random generator, or the seed for it
+        """
+        arrival_seed, warm_seed, cold_seed, scheduler_seed = spawn_seeds(rng, 4)
+        self.arrival_process.set_rng(arrival_seed)
+        self.warm_service_process.set_rng(warm_seed)
+        self.cold_service_process.set_rng(cold_seed)
+        self.scheduler.set_rng(scheduler_seed)
+
     def reset_trace(self):
         """resets all the historical data to prepare the class for a new simulation
         """
@@ -90,17 +140,137 @@ class ServerlessSimulator:
         self.total_reject_count = 0
         # current state of instances
         self.servers = []
+        # position of each instance in `self.servers`, used for removing instances in constant time
+        self.server_positions = {}
+        # the event queue holding the next transition of each instance
+        self.event_queue = InstanceQueue()
+        # sequential id given to each live instance in order of creation, used for breaking ties
+        self.instance_ids = {}
+        self.next_instance_id = 0
         self.server_count = 0
         self.running_count = 0
         self.idle_count = 0
-        # history results
-        self.hist_times = []
-        self.hist_server_count = []
-        self.hist_server_running_count = []
-        self.hist_server_idle_count = []
-        self.hist_req_cold_idxs = []
-        self.hist_req_warm_idxs = []
-        self.hist_req_rej_idxs = []
+        # history results, accessible as read-only arrays through `self.hist_*` properties
+        self._hist_times = HistoryBuffer(float)
+        self._hist_server_count = HistoryBuffer(int)
+        self._hist_server_running_count = HistoryBuffer(int)
+        self._hist_server_idle_count = HistoryBuffer(int)
+        self._hist_req_cold_idxs = HistoryBuffer(int)
+        self._hist_req_warm_idxs = HistoryBuffer(int)
+        self._hist_req_rej_idxs = HistoryBuffer(int)
+        self._hist_lifespans = HistoryBuffer(float)
+        self._time_lengths = None
+        # running sums used instead of the history when record_history is False
+        self.online_time = 0
+        self.online_counts = (0, 0, 0)
+        self.online_server_count_sum = 0
+        self.online_running_count_sum = 0
+        self.online_idle_count_sum = 0
+        # running mean and variance of instance life spans (Welford's algorithm)
+        self.lifespan_count = 0
+        self.lifespan_mean = 0
+        self.lifespan_m2 = 0
+
+    @property
+    def hist_times(self):
+        """numpy.ndarray: The time of each event, followed by the end time of the trace"""
+        return self._hist_times.view()
+
+    @property
+    def hist_server_count(self):
+        """numpy.ndarray: The number of instances after each event"""
+        return self._hist_server_count.view()
+
+    @property
+    def hist_server_running_count(self):
+        """numpy.ndarray: The number of running instances after each event"""
+        return self._hist_server_running_count.view()
+
+    @property
+    def hist_server_idle_count(self):
+        """numpy.ndarray: The number of idle instances after each event"""
+        return self._hist_server_idle_count.view()
+
+    @property
+    def hist_req_cold_idxs(self):
+        """numpy.ndarray: The event index of each cold start request"""
+        return self._hist_req_cold_idxs.view()
+
+    @property
+    def hist_req_warm_idxs(self):
+        """numpy.ndarray: The event index of each warm start request"""
+        return self._hist_req_warm_idxs.view()
+
+    @property
+    def hist_req_rej_idxs(self):
+        """numpy.ndarray: The event index of each rejected request"""
+        return self._hist_req_rej_idxs.view()
+
+    @property
+    def hist_lifespans(self):
+        """numpy.ndarray: The lifespan of each terminated instance, in order of termination"""
+        return self._hist_lifespans.view()
+
+    def save_trace(self, path):
+        """Save the history of the simulated trace in the directory `path`, so that it can be analyzed later without simulating it again. Each of the history arrays listed in `trace_columns` is stored as a separate `.npy` file, which can be memory-mapped when loading, and the totals and parameters listed in `trace_attributes` are stored in `meta.json`.
+
+        Parameters
+        ----------
+        path : str
+            The directory in which the trace is stored, created if it does not exist
+
+        Raises
+        ------
+        Exception
+            Raises if the history has not been recorded (`record_history` is False)
+        """
+        if not self.record_history:
+            raise Exception('Cannot save the trace when record_history is False!')
+
+        os.makedirs(path, exist_ok=True)
+        columns = {}
+        for name in self.trace_columns:
+            values = getattr(self, name)
+            np.save(os.path.join(path, f"{name}.npy"), values)
+            columns[name] = {'dtype': values.dtype.str, 'length': len(values)}
+
+        meta = {
+            'version': 1,
+            'simulator': self.__class__.__name__,
+            'columns': columns,
+            'attributes': {a: getattr(self, a) for a in self.trace_attributes},
+        }
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            # numpy scalars are not json serializable
+            json.dump(meta, f, indent=2, default=lambda v: v.item())
+
+    def load_trace(self, path, mmap_mode='r'):
+        """Load a trace stored by :func:`~simfaas.ServerlessSimulator.ServerlessSimulator.save_trace`, replacing the results of the current trace. All the methods analyzing the history can be used afterwards. Instances are not stored, so `prev_servers` is empty after loading, and the lifespans of terminated instances are available in `hist_lifespans`.
+
+        Parameters
+        ----------
+        path : str
+            The directory in which the trace is stored
+        mmap_mode : str, optional
+            The mode used to memory-map the history arrays (refer to :func:`numpy.load`), the default 'r' leaves them on the disk and only reads the parts accessed, None loads them into memory, by default 'r'
+
+        Raises
+        ------
+        Exception
+            Raises if the trace has been saved by a different simulator class
+        """
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta['simulator'] != self.__class__.__name__:
+            raise Exception(f"Trace has been saved by {meta['simulator']}, not {self.__class__.__name__}!")
+
+        self.reset_trace()
+        self.record_history = True
+        for name, value in meta['attributes'].items():
+            setattr(self, name, value)
+        for name in meta['columns']:
+            values = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            setattr(self, f"_{name}", HistoryBuffer.from_array(values))
 
     def has_server(self):
         """Returns True if there are still instances (servers) in the simulated platform, False otherwise.
@@ -115,15 +285,110 @@ class ServerlessSimulator:
     def __str__(self):
         return f"idle/running/total: \t {self.idle_count}/{self.running_count}/{self.server_count}"
 
-    def req(self):
+    def req(self, t=0):
         """Generate a request inter-arrival from `self.arrival_process`
 
+        Parameters
+        ----------
+        t : float, optional
+            The time of the current arrival, used by time-varying arrival processes, by default 0
+
         Returns
         -------
         float
             The generated inter-arrival sample
         """
-        return self.arrival_process.generate_trace()
+        return self.arrival_process.generate_trace_at(t)
+
+    def batch_arrival(self, t, count):
+        """Goes through the arrival of a batch of `count` simultaneous requests in a single step of the simulation. The split of the batch is calculated once: the instances for the warm starts are selected in a single call to :func:`~simfaas.Scheduler.Scheduler.select_many`, and the rest of the requests cause cold starts, or are rejected once the maximum concurrency or the maximum number of instances is reached. Each selected instance takes as many of the requests as it can accept. The result is the same as processing the requests one by one for policies whose selection does not depend on the load of the instances (e.g. the default newest first policy).
+
+        Parameters
+        ----------
+        t : float
+            The time at which the batch arrives
+        count : int
+            The number of requests in the batch
+        """
+        hist_idx = len(self._hist_times) - 1
+        self.total_req_count += count
+
+        # warm starts, limited by the free slots of the ready instances and the maximum concurrency
+        warm_capacity = self.get_warm_capacity()
+        warm_count = min(count, warm_capacity, max(self.maximum_concurrency - self.get_inflight_count(), 0))
+        if warm_count > 0:
+            remaining = warm_count
+            for instance in self.scheduler.select_many(t, warm_count, self.get_free_slots):
+                assigned = min(remaining, self.get_free_slots(instance))
+                was_idle = instance.is_idle()
+                for _ in range(assigned):
+                    instance.arrival_transition(t)
+                # selected instances are added back to the scheduler here, even if they did not get a request
+                self.update_instance(instance, t)
+                remaining -= assigned
+                if was_idle and assigned > 0:
+                    self.idle_count -= 1
+                    self.running_count += 1
+        remaining = count - warm_count
+
+        # the rest of the requests are rejected while there are ready instances, otherwise they cause cold starts
+        cold_count = 0
+        cold_warm_count = 0
+        if warm_count == warm_capacity:
+            while remaining > 0:
+                if self.get_inflight_count() >= self.maximum_concurrency or \
+                        (self.maximum_instances is not None and self.server_count >= self.maximum_instances):
+                    break
+                self.server_count += 1
+                self.running_count += 1
+                new_server = self.create_instance(t)
+                self.add_server(new_server)
+                self.register_instance(new_server, t)
+                cold_count += 1
+                remaining -= 1
+
+                # the new instance might accept more of the requests as warm starts
+                assigned = min(remaining, self.get_free_slots(new_server),
+                               max(self.maximum_concurrency - self.get_inflight_count(), 0))
+                if assigned > 0:
+                    for _ in range(assigned):
+                        new_server.arrival_transition(t)
+                    self.update_instance(new_server, t)
+                    cold_warm_count += assigned
+                    remaining -= assigned
+
+        self.total_warm_count += warm_count + cold_warm_count
+        self.total_cold_count += cold_count
+        self.total_reject_count += remaining
+        if self.record_history:
+            self._hist_req_warm_idxs.append_repeated(hist_idx, warm_count + cold_warm_count)
+            self._hist_req_cold_idxs.append_repeated(hist_idx, cold_count)
+            self._hist_req_rej_idxs.append_repeated(hist_idx, remaining)
+
+    def get_warm_capacity(self):
+        """Get the number of requests that can be accepted by the instances that are ready, each idle instance accepts one request.
+
+        Returns
+        -------
+        int
+            The number of requests that can start warm
+        """
+        return self.idle_count
+
+    def get_free_slots(self, instance):
+        """Get the number of requests that an instance can accept right now, each instance processes one request at a time.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance
+
+        Returns
+        -------
+        int
+            The number of requests the instance can accept
+        """
+        return 1 if instance.is_ready() else 0
 
     def cold_start_arrival(self, t):
         """Goes through the process necessary for a cold start arrival which includes generation of a new function instance in the `COLD` state and adding it to the cluster.
@@ -135,19 +400,124 @@ class ServerlessSimulator:
         """
         self.total_req_count += 1
 
-        # reject request if maximum concurrency reached
-        if self.running_count == self.maximum_concurrency:
+        # reject request if maximum concurrency or maximum number of instances reached
+        if self.get_inflight_count() >= self.maximum_concurrency or \
+                (self.maximum_instances is not None and self.server_count >= self.maximum_instances):
             self.total_reject_count += 1
-            self.hist_req_rej_idxs.append(len(self.hist_times) - 1)
+            if self.record_history:
+                self._hist_req_rej_idxs.append(len(self._hist_times) - 1)
             return
 
         self.total_cold_count += 1
-        self.hist_req_cold_idxs.append(len(self.hist_times) - 1)
+        if self.record_history:
+            self._hist_req_cold_idxs.append(len(self._hist_times) - 1)
 
         self.server_count += 1
         self.running_count += 1
-        new_server = FunctionInstance(t, self.cold_service_process, self.warm_service_process, self.expiration_threshold)
-        self.servers.append(new_server)
+        new_server = self.create_instance(t)
+        self.add_server(new_server)
+        self.register_instance(new_server, t)
+
+    def add_server(self, instance):
+        """Add a new instance to `self.servers`.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The newly created instance
+        """
+        self.server_positions[instance] = len(self.servers)
+        self.servers.append(instance)
+
+    def remove_server(self, instance):
+        """Remove an instance from `self.servers` in constant time by moving the last instance into its place, so the order of `self.servers` is not preserved (ties between instances are broken using `self.instance_ids` instead).
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance to be removed
+        """
+        idx = self.server_positions.pop(instance)
+        last = self.servers.pop()
+        if last is not instance:
+            self.servers[idx] = last
+            self.server_positions[last] = idx
+
+    def get_inflight_count(self):
+        """Get the number of requests being processed on the system, which is compared against `maximum_concurrency`. Each running instance processes exactly one request, so this is the number of running instances.
+
+        Returns
+        -------
+        int
+            The number of requests being processed
+        """
+        return self.running_count
+
+    def create_instance(self, t):
+        """Create a new function instance for a cold start arrival, child classes can override this to simulate other types of function instances.
+
+        Parameters
+        ----------
+        t : float
+            The time at which the instance is being created
+
+        Returns
+        -------
+        simfaas.FunctionInstance.FunctionInstance
+            The newly created function instance
+        """
+        return FunctionInstance(t, self.cold_service_process, self.warm_service_process, self.expiration_threshold)
+
+    def register_instance(self, instance, t):
+        """Give an id to a newly added instance and add it to the event queue and the scheduler.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance that has been added to `self.servers`
+        t : float
+            Current time
+        """
+        self.instance_ids[instance] = self.next_instance_id
+        self.next_instance_id += 1
+        self.update_instance(instance, t)
+
+    def update_instance(self, instance, t):
+        """Update the event queue and the scheduler after an instance has made a transition, must be called whenever the state of an instance changes.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The instance that has made a transition
+        t : float
+            Current time
+        """
+        if instance.state_code == TERM:
+            self.event_queue.remove(instance)
+            self.scheduler.remove(instance)
+            # only live instances are kept, so the memory usage does not grow with the number of terminated instances
+            del self.instance_ids[instance]
+            return
+
+        self.event_queue.push(instance, (instance.get_next_event_time(), self.instance_ids[instance]))
+        if instance.is_ready():
+            if instance in self.scheduler:
+                self.scheduler.update(instance, t)
+            else:
+                self.scheduler.add(instance, t)
+        else:
+            self.scheduler.remove(instance)
+
+    def build_event_queue(self):
+        """Build the event queue and the scheduler data structures from scratch using the instances currently in `self.servers`, which allows the instances to be added or modified before the simulation starts (e.g. in :class:`~simfaas.ServerlessTemporalSimulator.ServerlessTemporalSimulator`).
+        """
+        self.event_queue = InstanceQueue()
+        self.instance_ids = {}
+        self.next_instance_id = 0
+        self.server_positions = {s: idx for idx, s in enumerate(self.servers)}
+        self.scheduler.reset(self)
+        for s in self.servers:
+            self.register_instance(s, 0)
 
     def schedule_warm_instance(self, t):
         """Goes through a process to determine which warm instance should process the incoming request.
@@ -162,14 +532,7 @@ class ServerlessSimulator:
         simfaas.FunctionInstance.FunctionInstance
             The function instances that the scheduler has selected for the incoming request.
         """
-        idle_instances = [s for s in self.servers if s.is_ready()]
-        creation_times = [s.creation_time for s in idle_instances]
-        
-        # scheduling mechanism
-        creation_times = np.array(creation_times)
-        # find the newest instance
-        idx = np.argmax(creation_times)
-        return idle_instances[idx]
+        return self.scheduler.select(t)
 
     def warm_start_arrival(self, t):
         """Goes through the process necessary for a warm start arrival which includes selecting a warm instance for processing and recording the request information.
@@ -182,17 +545,20 @@ class ServerlessSimulator:
         self.total_req_count += 1
 
         # reject request if maximum concurrency reached
-        if self.running_count == self.maximum_concurrency:
+        if self.get_inflight_count() >= self.maximum_concurrency:
             self.total_reject_count += 1
-            self.hist_req_rej_idxs.append(len(self.hist_times) - 1)
+            if self.record_history:
+                self._hist_req_rej_idxs.append(len(self._hist_times) - 1)
             return
 
-        self.hist_req_warm_idxs.append(len(self.hist_times) - 1)
+        if self.record_history:
+            self._hist_req_warm_idxs.append(len(self._hist_times) - 1)
 
         # schedule the request
         instance = self.schedule_warm_instance(t)
         was_idle = instance.is_idle()
         instance.arrival_transition(t)
+        self.update_instance(instance, t)
 
         # transition from idle to running
         self.total_warm_count += 1
@@ -208,12 +574,35 @@ class ServerlessSimulator:
         float
             The time at which the trace has ended
         """
+        if not self.record_history:
+            return self.online_time
         return self.hist_times[-1]
 
     def calculate_time_lengths(self):
         """Calculate the time length for each step between two event transitions. Records the values in `self.time_lengths`.
         """
-        self.time_lengths = np.diff(self.hist_times)
+        self._time_lengths = np.diff(self.hist_times)
+
+    @property
+    def time_lengths(self):
+        """numpy.ndarray: The amount of time spent after each event, until the next event, calculated on first access if :func:`~simfaas.ServerlessSimulator.ServerlessSimulator.calculate_time_lengths` has not been called (e.g. after loading a trace)"""
+        if self._time_lengths is None:
+            self.calculate_time_lengths()
+        return self._time_lengths
+
+    @time_lengths.setter
+    def time_lengths(self, time_lengths):
+        self._time_lengths = time_lengths
+
+    def get_event_count(self):
+        """Get the number of events in the history, which is the length of the `hist_*` arrays (except `hist_times`, which also holds the end time of the trace).
+
+        Returns
+        -------
+        int
+            The number of events
+        """
+        return len(self._hist_server_count)
 
     def get_average_server_count(self):
         """Get the time-average server count.
@@ -223,7 +612,9 @@ class ServerlessSimulator:
         float
             Average server count
         """
-        avg_server_count = (self.hist_server_count * self.time_lengths).sum() / self.get_trace_end()
+        if not self.record_history:
+            return self.online_server_count_sum / self.get_trace_end()
+        avg_server_count = self.get_window().get_time_weighted_sum(self.hist_server_count) / self.get_trace_end()
         return avg_server_count
 
     def get_average_server_running_count(self):
@@ -234,7 +625,9 @@ class ServerlessSimulator:
         float
             Average running server coutn
         """
-        avg_running_count = (self.hist_server_running_count * self.time_lengths).sum() / self.get_trace_end()
+        if not self.record_history:
+            return self.online_running_count_sum / self.get_trace_end()
+        avg_running_count = self.get_window().get_time_weighted_sum(self.hist_server_running_count) / self.get_trace_end()
         return avg_running_count
 
     def get_average_server_idle_count(self):
@@ -245,7 +638,9 @@ class ServerlessSimulator:
         float
             Average idle server count
         """
-        avg_idle_count = (self.hist_server_idle_count * self.time_lengths).sum() / self.get_trace_end()
+        if not self.record_history:
+            return self.online_idle_count_sum / self.get_trace_end()
+        avg_idle_count = self.get_window().get_time_weighted_sum(self.hist_server_idle_count) / self.get_trace_end()
         return avg_idle_count
 
     def get_index_after_time(self, t):
@@ -261,7 +656,8 @@ class ServerlessSimulator:
         int
             The calculated index in `self.hist_times`
         """
-        return np.min(np.where(np.array(self.hist_times) > t))
+        # hist_times is sorted, so a binary search is enough
+        return int(np.searchsorted(self.hist_times, t, side='right'))
 
     def get_skip_init(self, skip_init_time=None, skip_init_index=None):
         """Get the minimum index which satisfies both the time and index count we want to skip in the beginning of the simulation, which is used to reduce the transient effect for calculating the steady-state values.
@@ -286,6 +682,52 @@ class ServerlessSimulator:
             skip_init = max(skip_init, skip_init_index)
         return skip_init
 
+    def get_window(self, start_time=None, end_time=None, skip_init_index=None):
+        """Get a view over the history in the time window [start_time, end_time), which can be used to analyze a part of the trace without copying the history arrays. The window starts from the event in effect at `start_time` (the last event at or before it), and the time lengths of the events are clipped to the window, so time averages cover exactly [start_time, end_time).
+
+        Parameters
+        ----------
+        start_time : float, optional
+            The beginning of the window, by default None which starts the window from the beginning of the trace
+        end_time : float, optional
+            The end of the window, by default None which ends the window at the end of the trace
+        skip_init_index : int, optional
+            The minimum number of indices skipped in the beginning, by default None
+
+        Returns
+        -------
+        simfaas.HistoryWindow.HistoryWindow
+            The view over the history in the window
+        """
+        start = 0
+        if start_time is not None:
+            start = max(int(np.searchsorted(self.hist_times, start_time, side='right')) - 1, 0)
+        if skip_init_index is not None:
+            start = max(start, skip_init_index)
+        stop = self.get_event_count()
+        if end_time is not None:
+            stop = min(stop, int(np.searchsorted(self.hist_times, end_time, side='left')))
+        return HistoryWindow(self, start, max(start, stop), start_time=start_time, end_time=end_time)
+
+    def get_skip_init_window(self, skip_init_time=None, skip_init_index=None):
+        """Get a view over the history after skipping the beginning of the trace, refer to :func:`~simfaas.ServerlessSimulator.ServerlessSimulator.get_skip_init`.
+
+        Parameters
+        ----------
+        skip_init_time : float, optional
+            The amount of time skipped in the beginning, by default None
+        skip_init_index : int, optional
+            The number of indices skipped in the beginning, by default None
+
+        Returns
+        -------
+        simfaas.HistoryWindow.HistoryWindow
+            The view over the history after the skipped part
+        """
+        skip_init = self.get_skip_init(skip_init_time=skip_init_time, 
+                                        skip_init_index=skip_init_index)
+        return HistoryWindow(self, skip_init, self.get_event_count())
+
     def get_request_custom_states(self, hist_states, skip_init_time=None, skip_init_index=None):
         """Get request statistics for an array of custom states.
 
@@ -303,39 +745,9 @@ class ServerlessSimulator:
         pandas.DataFrame
             A pandas dataframe including different statistics like `p_cold` (probability of cold start)
         """
-        req_skip_init = self.get_skip_init(skip_init_time=skip_init_time, 
-                                        skip_init_index=skip_init_index)
-
-        state_req_colds = {}
-        state_req_warm = {}
-        state_req_rejs = {}
-        for s in hist_states[req_skip_init:]:
-            if s not in state_req_colds:
-                state_req_colds[s] = 0
-                state_req_warm[s] = 0
-                state_req_rejs[s] = 0
-
-        hist_req_cold = [i for i in self.hist_req_cold_idxs if i > req_skip_init]
-        hist_req_warm = [i for i in self.hist_req_warm_idxs if i > req_skip_init]
-        hist_req_rej = [i for i in self.hist_req_rej_idxs if i > req_skip_init]
-
-
-        for idx in hist_req_cold:
-            state_req_colds[hist_states[idx]] += 1
-        for idx in hist_req_warm:
-            state_req_warm[hist_states[idx]] += 1
-        for idx in hist_req_rej:
-            state_req_warm[hist_states[idx]] += 1
-
-        states = list(state_req_colds.keys())
-        state_req_colds = list(state_req_colds.values())
-        state_req_warm = list(state_req_warm.values())
-        state_req_rejs = list(state_req_rejs.values())
-
-        reqdf = pd.DataFrame(data = {'state': states, 'cold': state_req_colds, 'warm': state_req_warm, 'rej': state_req_rejs})
-        reqdf['total'] = reqdf['cold'] + reqdf['warm'] + reqdf['rej']
-        reqdf['p_cold'] = reqdf['cold'] / reqdf['total']
-        return reqdf
+        window = self.get_skip_init_window(skip_init_time=skip_init_time, 
+                                            skip_init_index=skip_init_index)
+        return window.get_request_custom_states(hist_states)
 
     def analyze_custom_states(self, hist_states, skip_init_time=None, skip_init_index=None):
         """Analyses a custom states list and calculates the amount of time spent in each state each time we enterred that state, and the times at which transitions have happened.
@@ -351,37 +763,12 @@ class ServerlessSimulator:
 
         Returns
         -------
-        list[float], list[float]
-            (residence_times, transition_times) where residence_times is an array of the amount of times we spent in each state, and transition_times are the moments of time at which each transition has occured
+        dict[object, numpy.ndarray], dict[tuple, numpy.ndarray]
+            (residence_times, transition_times) where residence_times maps each state to an array of the amount of times we spent in that state each time we enterred it, and transition_times maps each transition pair `(from_state, to_state)` to an array of the amount of times spent in `from_state` before each of those transitions. The last visit, which has not ended with a transition, is not included.
         """
-        skip_init = self.get_skip_init(skip_init_time=skip_init_time, 
-                                        skip_init_index=skip_init_index)
-
-        values = hist_states[skip_init:]
-        time_lengths = self.time_lengths[skip_init:]
-
-        residence_times = {}
-        transition_times = {}
-        curr_time_sum = time_lengths[0]
-        # encode states
-        for idx in range(1,len(values)):
-            if values[idx] == values[idx-1]:
-                curr_time_sum += time_lengths[idx]
-            else:
-                if values[idx-1] in residence_times:
-                    residence_times[values[idx-1]].append(curr_time_sum)
-                else:
-                    residence_times[values[idx-1]] = [curr_time_sum]
-
-                transition_pair = (values[idx-1], values[idx])
-                if transition_pair in transition_times:
-                    transition_times[transition_pair].append(curr_time_sum)
-                else:
-                    transition_times[transition_pair] = [curr_time_sum]
-                
-                curr_time_sum = time_lengths[idx]
-
-        return residence_times, transition_times
+        window = self.get_skip_init_window(skip_init_time=skip_init_time, 
+                                            skip_init_index=skip_init_index)
+        return window.analyze_custom_states(hist_states)
 
     def get_average_residence_times(self, hist_states, skip_init_time=None, skip_init_index=None):
         """Get the average residence time for each state in custom state encoding.
@@ -427,8 +814,52 @@ class ServerlessSimulator:
         float
             The average lifespan
         """
-        life_spans = np.array([s.get_life_span() for s in self.prev_servers])
-        return life_spans.mean()
+        if self.lifespan_count == 0:
+            return np.nan
+        if not self.record_history:
+            return self.lifespan_mean
+        return self.hist_lifespans.mean()
+
+    def get_lifespan_variance(self):
+        """Get the variance of the lifespan of instances, calculated using running sums updated on each termination.
+
+        Returns
+        -------
+        float
+            The variance of lifespans
+        """
+        if self.lifespan_count == 0:
+            return np.nan
+        return self.lifespan_m2 / self.lifespan_count
+
+    def record_termination(self, instance):
+        """Record the information about an instance that has just been terminated.
+
+        Parameters
+        ----------
+        instance : simfaas.FunctionInstance.FunctionInstance
+            The terminated instance
+        """
+        if self.record_history:
+            self.prev_servers.append(instance)
+        self.record_lifespan(instance.get_life_span())
+
+    def record_lifespan(self, life_span):
+        """Record the lifespan of an instance that has just been terminated.
+
+        Parameters
+        ----------
+        life_span : float
+            The amount of time from the creation of the instance until its termination
+        """
+        if self.record_history:
+            self._hist_lifespans.append(life_span)
+
+        # update running mean and variance of lifespans
+        self.lifespan_count += 1
+        delta = life_span - self.lifespan_mean
+        self.lifespan_mean += delta / self.lifespan_count
+        self.lifespan_m2 += delta * (life_span - self.lifespan_mean)
 
     
     def get_result_dict(self):
@@ -455,7 +886,8 @@ class ServerlessSimulator:
     def print_trace_results(self):
         """Print a brief summary of the results of the trace.
         """
-        self.calculate_time_lengths()
+        if self.record_history:
+            self.calculate_time_lengths()
 
         print(f"Cold Starts / total requests: \t {self.total_cold_count} / {self.total_req_count}")
         print(f"Cold Start Probability: \t {self.total_cold_count / self.total_req_count:.4f}")
@@ -464,9 +896,8 @@ class ServerlessSimulator:
         print(f"Rejection Probability: \t\t {self.total_reject_count / self.total_req_count:.4f}")
 
         # average instance life span
-        life_spans = np.array([s.get_life_span() for s in self.prev_servers])
-        if len(life_spans) > 0:
-            print(f"Average Instance Life Span: \t {life_spans.mean():.4f}")
+        if self.lifespan_count > 0:
+            print(f"Average Instance Life Span: \t {self.get_average_lifespan():.4f}")
 
         # average instance count
         print(f"Average Server Count:  \t\t {self.get_average_server_count():.4f}")
@@ -526,25 +957,11 @@ class ServerlessSimulator:
             returns (unq_vals, val_times) where unq_vals is the unique values inside the values list
             and val_times is the portion of the time that is spent in that value.
         """
-        assert len(values) == len(self.time_lengths), "Values shoud be same length as history array (number of transitions)"
-
-        skip_init = self.get_skip_init(skip_init_time=skip_init_time, 
-                                        skip_init_index=skip_init_index)
-
-        values = values[skip_init:]
-        time_lengths = self.time_lengths[skip_init:]
+        assert len(values) == self.get_event_count(), "Values shoud be same length as history array (number of transitions)"
 
-        # get unique values
-        unq_vals = list(set(values))
-        val_times = []
-        for val in unq_vals:
-            t = time_lengths[[v == val for v in values]].sum()
-            val_times.append(t)
-
-        # convert to percent
-        val_times = np.array(val_times)
-        val_times = val_times / val_times.sum()
-        return unq_vals, val_times
+        window = self.get_skip_init_window(skip_init_time=skip_init_time, 
+                                            skip_init_index=skip_init_index)
+        return window.calculate_time_average(values)
 
     
     def is_warm_available(self, t):
@@ -571,9 +988,26 @@ class ServerlessSimulator:
         t : float
             Current time
         """
-        self.hist_server_count.append(self.server_count)
-        self.hist_server_running_count.append(self.running_count)
-        self.hist_server_idle_count.append(self.idle_count)
+        self._hist_server_count.append(self.server_count)
+        self._hist_server_running_count.append(self.running_count)
+        self._hist_server_idle_count.append(self.idle_count)
+
+    def update_online_stats(self, t):
+        """Update the running time-weighted sums, used instead of the history arrays when `record_history` is False.
+
+        Parameters
+        ----------
+        t : float
+            Current time
+        """
+        time_length = t - self.online_time
+        server_count, running_count, idle_count = self.online_counts
+        self.online_server_count_sum += server_count * time_length
+        self.online_running_count_sum += running_count * time_length
+        self.online_idle_count_sum += idle_count * time_length
+
+        self.online_time = t
+        self.online_counts = (self.server_count, self.running_count, self.idle_count)
 
 
     def generate_trace(self, debug_print=False, progress=False):
@@ -598,14 +1032,20 @@ class ServerlessSimulator:
         t = 0
         pbar_t_update = 0
         pbar_interval = int(self.max_time / 100)
-        next_arrival = t + self.req()
+        self.build_event_queue()
+        # whether each arrival event holds a batch of requests
+        has_batches = getattr(self.arrival_process, 'has_batches', False)
+        next_arrival = t + self.req(t)
         while self.trace_condition(t):
             if progress:
                 if int(t - pbar_t_update) > pbar_interval:
                     pbar.update(int(t) - pbar_t_update)
                     pbar_t_update = int(t)
-            self.hist_times.append(t)
-            self.update_hist_arrays(t)
+            if self.record_history:
+                self._hist_times.append(t)
+                self.update_hist_arrays(t)
+            else:
+                self.update_online_stats(t)
             if debug_print:
                 print()
                 print(f"Time: {t:.2f} \t NextArrival: {next_arrival:.2f}")
@@ -615,19 +1055,29 @@ class ServerlessSimulator:
 
             # if there are no servers, next transition is arrival
             if self.has_server() == False:
+                # the arrival process has no more arrivals (e.g. the end of a replayed trace)
+                if next_arrival == np.inf:
+                    break
                 t = next_arrival
-                next_arrival = t + self.req()
+                next_arrival = t + self.req(t)
+                if has_batches:
+                    self.batch_arrival(t, self.arrival_process.generate_batch_size())
+                    continue
                 # no servers, so cold start
                 self.cold_start_arrival(t)
                 continue
 
             # if there are servers, next transition is the soonest one
-            server_next_transitions = np.array([s.get_next_transition_time(t) for s in self.servers])
+            instance = self.event_queue.peek()
+            next_transition = instance.get_next_transition_time(t)
 
             # if next transition is arrival
-            if (next_arrival - t) < server_next_transitions.min():
+            if (next_arrival - t) < next_transition:
                 t = next_arrival
-                next_arrival = t + self.req()
+                next_arrival = t + self.req(t)
+                if has_batches:
+                    self.batch_arrival(t, self.arrival_process.generate_batch_size())
+                    continue
 
                 # if warm start
                 if self.is_warm_available(t):
@@ -639,32 +1089,35 @@ class ServerlessSimulator:
 
             # if next transition is a state change in one of servers
             else:
-                # find the server that needs transition
-                idx = server_next_transitions.argmin()
-                t = t + server_next_transitions[idx]
-                new_state = self.servers[idx].make_transition()
+                t = t + next_transition
+                instance.make_transition()
+                new_state = instance.state_code
+                self.update_instance(instance, t)
                 # delete instance if it was just terminated
-                if new_state == 'TERM':
-                    self.prev_servers.append(self.servers[idx])
+                if new_state == TERM:
+                    self.record_termination(instance)
                     self.idle_count -= 1
                     self.server_count -= 1
-                    del self.servers[idx]
                     if debug_print:
-                        print(f"Termination for: # {idx}")
+                        print(f"Termination for: # {self.server_positions[instance]}")
+                    self.remove_server(instance)
                 
                 # if request has done processing (exit event)
-                elif new_state == 'IDLE':
+                elif new_state == IDLE:
                     # transition from running to idle
                     self.running_count -= 1
                     self.idle_count += 1
                 else:
                     # force this only if we are running current class, not child classes
                     if self.__class__ == ServerlessSimulator:
-                        raise Exception(f"Unknown transition in states: {new_state}")
+                        raise Exception(f"Unknown transition in states: {instance.get_state()}")
 
         # after the trace loop, append the last time recorded
-        self.hist_times.append(t)
-        self.calculate_time_lengths()
+        if self.record_history:
+            self._hist_times.append(t)
+            self.calculate_time_lengths()
+        else:
+            self.update_online_stats(t)
         if progress:
             pbar.update(int(self.max_time) - pbar_t_update)
             pbar.close()
@@ -1,8 +1,14 @@
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+import math
+
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from scipy.stats import expon, poisson, norm
 
-from simfaas.Utility import convert_hist_pdf
+from simfaas.Utility import convert_hist_pdf, create_rng, spawn_seeds
 
 # import warnings
 # warnings.simplefilter(action='ignore', category=FutureWarning)
@@ -16,13 +22,47 @@ custom analytical model. In the child class, after performing `super().__init__(
 properties `self.has_pdf` and `self.has_cdf` by default value of `False` will
 be created. In case your class has the proposed PDF and CDF functions available,
 you need to override these values in order for your model PDF to show up in the output
-plot.
+plot. Child classes drawing random samples should use the generator returned by
+:func:`~simfaas.SimProcess.SimProcess.get_rng` so that each process can have its own random stream.
+Arrival processes in which several requests arrive at once should set `self.has_batches` to `True` and
+override :func:`~simfaas.SimProcess.SimProcess.generate_batch_size`.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used for drawing samples, by default None
+        which uses the global numpy random state
     """
-    def __init__(self):
+    def __init__(self, rng=None):
         super().__init__()
         # if your class has pdf or cdf functions, switch the booleans to True
         self.has_pdf = False
         self.has_cdf = False
+        # if each event of your process holds more than one arrival, switch the boolean to True
+        self.has_batches = False
+        self.set_rng(rng)
+
+    def set_rng(self, rng=None):
+        """Set the source of randomness used for drawing samples.
+
+        Parameters
+        ----------
+        rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            The random generator (or the seed for creating one), by default None which uses the global numpy random state
+        """
+        self.rng = create_rng(rng)
+
+    def get_rng(self):
+        """Get the source of randomness used for drawing samples.
+
+        Returns
+        -------
+        numpy.random.Generator
+            The random generator of this process, or the `numpy.random` module if no generator is set
+        """
+        if self.rng is None:
+            return np.random
+        return self.rng
 
     def pdf(self, x):
         """pdf function is called for visualization for classes with `self.has_pdf = True`.
@@ -65,9 +105,79 @@ of the child classes.
         """
         raise NotImplementedError
 
-    def visualize(self, num_traces=10000, num_bins=100):
+    def generate_trace_at(self, t):
+        """generate_trace_at generates a sample starting at time `t`, e.g. the time until the next arrival
+for an arrival at time `t`. By default, the processes do not depend on time, and this calls
+:func:`~simfaas.SimProcess.SimProcess.generate_trace`, time-varying processes should override it.
+
+        Parameters
+        ----------
+        t : float
+            The current time
+
+        Returns
+        -------
+        float
+            The generated sample
+        """
+        return self.generate_trace()
+
+    def generate_batch_size(self):
+        """generate_batch_size generates the number of arrivals in the next event, for classes with
+`self.has_batches = True`.
+
+        Returns
+        -------
+        int
+            The number of arrivals, 1 by default
+        """
+        return 1
+
+    def generate_traces(self, n):
+        """generate_traces generates `n` samples at once. By default, it calls
+:func:`~simfaas.SimProcess.SimProcess.generate_trace` `n` times, child classes that are able to
+draw vectorized samples should override it.
+
+        Parameters
+        ----------
+        n : int
+            Number of samples to be generated
+
+        Returns
+        -------
+        numpy.ndarray
+            The generated samples
+        """
+        return np.array([self.generate_trace() for _ in range(n)], dtype=float)
+
+    @staticmethod
+    def evaluate(func, x):
+        """Evaluate `func` (e.g. the pdf or cdf of a process) on an array of points, calling it once with the whole
+array if it supports arrays (like the scipy distributions), and point by point otherwise.
+
+        Parameters
+        ----------
+        func : callable
+            The function to be evaluated
+        x : numpy.ndarray
+            The points
+
+        Returns
+        -------
+        numpy.ndarray
+            The values of the function on the points
+        """
+        try:
+            values = np.asarray(func(x), dtype=float)
+            if values.shape == x.shape:
+                return values
+        except (TypeError, ValueError):
+            pass
+        return np.array([func(xi) for xi in x], dtype=float)
+
+    def visualize(self, num_traces=10000, num_bins=100, plot=True):
         """visualize function visualizes the PDF and CDF of the simulated process by generating
-traces from your function using :func:`~simfaas.SimProcess.SimProcess.generate_trace` and
+traces from your function using :func:`~simfaas.SimProcess.SimProcess.generate_traces` and
 converting the resulting histogram values (event counts) to densities to be comparable with
 PDF and CDF functions calculated analytically.
 
@@ -77,42 +187,126 @@ PDF and CDF functions calculated analytically.
             Number of traces we want to generate for calculating the histogram, by default 10000
         num_bins : int, optional
             Number of bins for the histogram which created the density probabilities, by default 100
+        plot : bool, optional
+            Whether or not the results should be plotted, by default True
+
+        Returns
+        -------
+        numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray
+            base, hist_values, cumulative, pdf_vals, cdf_vals where the first three are the results of
+            :func:`~simfaas.Utility.convert_hist_pdf`, and pdf_vals and cdf_vals are the model pdf and cdf on
+            `base`, or None if the process does not have them
         """
-        traces = np.array([self.generate_trace() for i in range(num_traces)])
+        traces = self.generate_traces(num_traces)
         print(f"Simulated Average Inter-Event Time: {np.mean(traces):.6f}")
         print(f"Simulated Average Event Rate: {num_traces / np.sum(traces):.6f}")
 
         base, hist_values, cumulative = convert_hist_pdf(traces, num_bins)
 
-        plt.figure()
-        plt.plot(base, hist_values, label='Sim Hist')
+        pdf_vals = None
         if self.has_pdf:
-            pdf_vals = np.array([0,0] + [self.pdf(x) for x in base[2:]])
-            plt.plot(base, pdf_vals, ls='--', label="Model PDF")
-        plt.legend()
-        plt.grid(True)
-
-        plt.figure()
-        plt.plot(base, cumulative, label='Sim Cumulative')
+            pdf_vals = np.concatenate([[0, 0], self.evaluate(self.pdf, base[2:])])
+        cdf_vals = None
         if self.has_cdf:
-            cdf_vals = np.array([0, 0] + [self.cdf(x) for x in base[2:]])
-            plt.plot(base, cdf_vals, ls='--', label="Model CDF")
-        plt.legend()
-        plt.grid(True)
+            cdf_vals = np.concatenate([[0, 0], self.evaluate(self.cdf, base[2:])])
+
+        if plot:
+            plt.figure()
+            plt.plot(base, hist_values, label='Sim Hist')
+            if pdf_vals is not None:
+                plt.plot(base, pdf_vals, ls='--', label="Model PDF")
+            plt.legend()
+            plt.grid(True)
+
+            plt.figure()
+            plt.plot(base, cumulative, label='Sim Cumulative')
+            if cdf_vals is not None:
+                plt.plot(base, cdf_vals, ls='--', label="Model CDF")
+            plt.legend()
+            plt.grid(True)
+
+        return base, hist_values, cumulative, pdf_vals, cdf_vals
 
 
-class ExpSimProcess(SimProcess):
+class BufferedSimProcess(SimProcess):
+    """BufferedSimProcess extends the functionality of :class:`~simfaas.SimProcess.SimProcess` for
+processes that can draw vectorized samples. Instead of drawing a single sample on each call to
+:func:`~simfaas.SimProcess.BufferedSimProcess.generate_trace`, a block of `block_size` samples
+is drawn using :func:`~simfaas.SimProcess.BufferedSimProcess.generate_block` and the samples are
+handed out one by one, which avoids the overhead of drawing scalar samples. Child classes only need
+to implement :func:`~simfaas.SimProcess.BufferedSimProcess.generate_block`.
+
+    Parameters
+    ----------
+    block_size : int, optional
+        The number of samples drawn at once, by default 1024
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used for drawing samples, by default None
+        which uses the global numpy random state
+    """
+    def __init__(self, block_size=1024, rng=None):
+        if block_size < 1:
+            raise ValueError("Block size should be at least 1!")
+        self.block_size = block_size
+
+        super().__init__(rng=rng)
+
+    def set_rng(self, rng=None):
+        super().set_rng(rng)
+        # samples drawn but not handed out yet, kept as python floats for fast access
+        # these are discarded when the generator changes
+        self.block = []
+        self.block_idx = 0
+
+    def generate_block(self, n):
+        """generate_block draws `n` samples using vectorized operations.
+
+        Parameters
+        ----------
+        n : int
+            Number of samples to be drawn
+
+        Raises
+        ------
+        NotImplementedError
+            By default, this function raises NotImplementedError unless overriden by a child class.
+        """
+        raise NotImplementedError
+
+    def generate_trace(self):
+        if self.block_idx >= len(self.block):
+            self.block = self.generate_block(self.block_size).tolist()
+            self.block_idx = 0
+        val = self.block[self.block_idx]
+        self.block_idx += 1
+        return val
+
+    def generate_traces(self, n):
+        # hand out the samples remaining in the current block first
+        buffered = self.block[self.block_idx:self.block_idx + n]
+        self.block_idx += len(buffered)
+        if len(buffered) == n:
+            return np.array(buffered, dtype=float)
+        return np.concatenate([np.array(buffered, dtype=float), self.generate_block(n - len(buffered))])
+
+
+class ExpSimProcess(BufferedSimProcess):
     """ExpSimProcess extends the functionality of :class:`~simfaas.SimProcess.SimProcess` for
 exponentially distributed processes. This class also implements the `pdf` and `cdf` functions
-which can be used for visualization purposes.
+which can be used for visualization purposes. Samples are drawn in blocks as described in
+:class:`~simfaas.SimProcess.BufferedSimProcess`.
 
     Parameters
     ----------
     rate : float
         The rate at which the process should fire off
+    block_size : int, optional
+        The number of samples drawn at once, by default 1024
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used for drawing samples, by default None
     """
-    def __init__(self, rate):
-        super().__init__()
+    def __init__(self, rate, block_size=1024, rng=None):
+        super().__init__(block_size=block_size, rng=rng)
 
         self.has_pdf = True
         self.has_cdf = True
@@ -124,8 +318,388 @@ which can be used for visualization purposes.
     def cdf(self, x):
         return expon.cdf(x, scale=1/self.rate)
 
+    def generate_block(self, n):
+        return self.get_rng().exponential(1/self.rate, size=n)
+
+
+class NonHomogeneousExpSimProcess(SimProcess):
+    """NonHomogeneousExpSimProcess extends the functionality of :class:`~simfaas.SimProcess.SimProcess` for
+non-homogeneous poisson processes, where the rate changes over time (e.g. daily load patterns). The rate is either
+piecewise-constant (`rates` starting at `rate_times`, optionally repeating every `period`), in which case arrivals
+are generated by inverting the integrated rate, or given by `rate_function`, in which case arrivals are generated by
+thinning a poisson process with rate `max_rate`. In both cases, arrivals are generated in batches of `block_size`
+using vectorized operations. The samples depend on the current time, which is passed to
+:func:`~simfaas.SimProcess.NonHomogeneousExpSimProcess.generate_trace_at` by the simulator, while
+:func:`~simfaas.SimProcess.NonHomogeneousExpSimProcess.generate_trace` continues from the last generated arrival
+(starting at time 0).
+
+    Parameters
+    ----------
+    rates : list[float], optional
+        The rate of each piece of the piecewise-constant rate, the last one is used until the end of the period
+        (or forever, if there is no period), by default None
+    rate_times : list[float], optional
+        The time at which each piece starts, the first one should be 0, by default None which is only allowed for a single rate
+    period : float, optional
+        The period after which the piecewise-constant rate repeats itself, by default None
+    rate_function : callable, optional
+        The rate as a function of time, used instead of `rates`, which should accept and return numpy arrays, by default None
+    max_rate : float, optional
+        An upper bound for `rate_function`, needed for thinning, by default None
+    block_size : int, optional
+        The number of arrivals (candidate arrivals for thinning) generated at once, by default 1024
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used for drawing samples, by default None
+
+    Raises
+    ------
+    ValueError
+        Raises if the rates are not valid, or if `rate_function` exceeds `max_rate`
+    """
+    def __init__(self, rates=None, rate_times=None, period=None, rate_function=None, max_rate=None,
+                 block_size=1024, rng=None):
+        self.block_size = block_size
+        super().__init__(rng=rng)
+
+        self.has_pdf = False
+        self.has_cdf = False
+        self.rate_function = rate_function
+        self.max_rate = max_rate
+        self.period = period
+
+        if rate_function is not None:
+            if max_rate is None or max_rate <= 0:
+                raise ValueError("A positive max_rate is needed for rate_function!")
+            return
+
+        if rates is None:
+            raise ValueError("Either rates or rate_function should be passed!")
+        self.rates = np.atleast_1d(np.asarray(rates, dtype=float))
+        if rate_times is None:
+            if len(self.rates) > 1:
+                raise ValueError("rate_times is needed for more than one rate!")
+            rate_times = [0]
+        self.rate_times = np.asarray(rate_times, dtype=float)
+
+        if len(self.rate_times) != len(self.rates) or self.rate_times[0] != 0:
+            raise ValueError("rate_times should start at 0 and have the same length as rates!")
+        if np.any(np.diff(self.rate_times) <= 0) or np.any(self.rates < 0):
+            raise ValueError("rate_times should be increasing, and rates should be non-negative!")
+        if period is not None and period <= self.rate_times[-1]:
+            raise ValueError("period should be larger than the start of the last piece!")
+
+        # the integrated rate at the start of each piece, and over a whole period
+        self.cum_rates = np.concatenate([[0], np.cumsum(self.rates[:-1] * np.diff(self.rate_times))])
+        if period is not None:
+            self.period_integral = self.cum_rates[-1] + self.rates[-1] * (period - self.rate_times[-1])
+
+    def set_rng(self, rng=None):
+        super().set_rng(rng)
+        # arrivals generated but not handed out yet, these are discarded when the generator changes
+        self.reset(getattr(self, 'current_time', 0))
+
+    def reset(self, t=0):
+        """Discard the arrivals generated so far, and continue generating arrivals from time `t`.
+
+        Parameters
+        ----------
+        t : float, optional
+            The time to continue from, by default 0
+        """
+        # the last arrival handed out, and the time up to which arrivals have been generated
+        self.current_time = t
+        self.scan_time = t
+        self.arrivals = []
+        self.arrival_idx = 0
+
+    def get_rate(self, t):
+        """Get the rate of the process at time `t`.
+
+        Parameters
+        ----------
+        t : float, numpy.ndarray
+            The time
+
+        Returns
+        -------
+        float, numpy.ndarray
+            The rate at time `t`
+        """
+        if self.rate_function is not None:
+            return self.rate_function(t)
+        t = np.asarray(t, dtype=float)
+        if self.period is not None:
+            t = np.mod(t, self.period)
+        return self.rates[np.searchsorted(self.rate_times, t, side='right') - 1]
+
+    def get_integrated_rate(self, t):
+        """Get the integral of the piecewise-constant rate from 0 to `t` (the expected number of arrivals).
+
+        Parameters
+        ----------
+        t : float, numpy.ndarray
+            The time
+
+        Returns
+        -------
+        float, numpy.ndarray
+            The integrated rate
+        """
+        t = np.asarray(t, dtype=float)
+        cycles = 0
+        if self.period is not None:
+            cycles, t = np.divmod(t, self.period)
+        idxs = np.searchsorted(self.rate_times, t, side='right') - 1
+        integrated = self.cum_rates[idxs] + self.rates[idxs] * (t - self.rate_times[idxs])
+        if self.period is not None:
+            integrated = integrated + cycles * self.period_integral
+        return integrated
+
+    def get_inverse_integrated_rate(self, y):
+        """Get the first time at which the integral of the piecewise-constant rate reaches `y`.
+
+        Parameters
+        ----------
+        y : numpy.ndarray
+            The integrated rate values
+
+        Returns
+        -------
+        numpy.ndarray
+            The times, `inf` if the integrated rate never reaches `y`
+        """
+        y = np.asarray(y, dtype=float)
+        cycles = 0
+        if self.period is not None:
+            if self.period_integral == 0:
+                return np.full(y.shape, np.inf)
+            cycles, y = np.divmod(y, self.period_integral)
+        idxs = np.searchsorted(self.cum_rates, y, side='right') - 1
+        rates = self.rates[idxs]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = self.rate_times[idxs] + (y - self.cum_rates[idxs]) / rates
+        # zero rates are only reached exactly at the start of the piece, or after the end of the last piece
+        t = np.where(rates > 0, t, np.where(y > self.cum_rates[idxs], np.inf, self.rate_times[idxs]))
+        if self.period is not None:
+            t = t + cycles * self.period
+        return t
+
+    def generate_arrival_times(self, t):
+        """Generate a batch of arrival times after time `t` using vectorized operations.
+
+        Parameters
+        ----------
+        t : float
+            The time from which arrivals are generated
+
+        Returns
+        -------
+        numpy.ndarray, float
+            (arrivals, scan_time) where arrivals holds at least one arrival time, and scan_time is the time up to which all arrivals are included
+        """
+        if t == np.inf:
+            return np.array([np.inf]), np.inf
+
+        rng = self.get_rng()
+        if self.rate_function is None:
+            arrivals = self.get_inverse_integrated_rate(self.get_integrated_rate(t)
+                                                        + np.cumsum(rng.exponential(1, size=self.block_size)))
+            return arrivals, arrivals[-1]
+
+        # thinning, keep drawing candidates until at least one is accepted
+        while True:
+            candidates = t + np.cumsum(rng.exponential(1 / self.max_rate, size=self.block_size))
+            rates = self.rate_function(candidates)
+            if np.any(rates > self.max_rate):
+                raise ValueError("rate_function should not exceed max_rate!")
+            arrivals = candidates[rng.random(self.block_size) * self.max_rate < rates]
+            t = candidates[-1]
+            if len(arrivals) > 0:
+                return arrivals, t
+
+    def generate_trace_at(self, t):
+        # the arrivals generated before are only valid if we continue from the last arrival
+        if not math.isclose(t, self.current_time, rel_tol=1e-9, abs_tol=1e-9):
+            self.reset(t)
+        if self.arrival_idx >= len(self.arrivals):
+            arrivals, self.scan_time = self.generate_arrival_times(self.scan_time)
+            self.arrivals = arrivals.tolist()
+            self.arrival_idx = 0
+        arrival = self.arrivals[self.arrival_idx]
+        self.arrival_idx += 1
+        self.current_time = arrival
+        # no more arrivals
+        if arrival == math.inf:
+            return math.inf
+        return arrival - t
+
     def generate_trace(self):
-        return np.random.exponential(1/self.rate)
+        return self.generate_trace_at(self.current_time)
+
+    def generate_traces(self, n):
+        start_time = self.current_time
+        parts = [np.array(self.arrivals[self.arrival_idx:], dtype=float)]
+        count = len(parts[0])
+        while count < n:
+            arrivals, self.scan_time = self.generate_arrival_times(self.scan_time)
+            parts.append(arrivals)
+            count += len(arrivals)
+
+        arrivals = np.concatenate(parts)
+        self.arrivals = arrivals[n:].tolist()
+        self.arrival_idx = 0
+        arrivals = arrivals[:n]
+        if n > 0:
+            self.current_time = arrivals[-1]
+        with np.errstate(invalid='ignore'):
+            samples = np.diff(arrivals, prepend=start_time)
+        # no more arrivals
+        samples[arrivals == np.inf] = np.inf
+        return samples
+
+
+class MMPPSimProcess(BufferedSimProcess):
+    """MMPPSimProcess extends the functionality of :class:`~simfaas.SimProcess.SimProcess` for markov-modulated
+poisson processes (MMPP), in which the arrival rate is decided by the state of a continuous-time markov chain,
+which can be used to model bursty traffic (e.g. a quiet state and a burst state). Random numbers are drawn in
+blocks, and samples are generated as described in :class:`~simfaas.SimProcess.BufferedSimProcess`.
+
+    Parameters
+    ----------
+    rates : list[float]
+        The arrival rate in each state of the markov chain
+    transition_rates : list[list[float]]
+        The matrix of the rates of transitions between states, element `[i][j]` being the rate of going from state
+        `i` to state `j`, the diagonal is ignored
+    initial_state : int, optional
+        The state of the markov chain at the beginning, by default 0
+    block_size : int, optional
+        The number of samples generated at once, by default 1024
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used for drawing samples, by default None
+
+    Raises
+    ------
+    ValueError
+        Raises if the rates are not valid, or if some state can neither generate arrivals nor leave
+    """
+    def __init__(self, rates, transition_rates, initial_state=0, block_size=1024, rng=None):
+        super().__init__(block_size=block_size, rng=rng)
+
+        self.rates = np.asarray(rates, dtype=float)
+        transition_rates = np.array(transition_rates, dtype=float)
+        num_states = len(self.rates)
+        if transition_rates.shape != (num_states, num_states):
+            raise ValueError("transition_rates should be a square matrix with the same size as rates!")
+        np.fill_diagonal(transition_rates, 0)
+        if np.any(self.rates < 0) or np.any(transition_rates < 0):
+            raise ValueError("Rates should be non-negative!")
+
+        leave_rates = transition_rates.sum(axis=1)
+        self.total_rates = self.rates + leave_rates
+        if np.any(self.total_rates <= 0):
+            raise ValueError("Each state should either generate arrivals or transition to another state!")
+        # the probability that the next event in each state is an arrival, and the cumulative
+        # probabilities of the next state otherwise
+        self.arrival_probs = (self.rates / self.total_rates).tolist()
+        with np.errstate(invalid='ignore'):
+            jump_cum_probs = np.cumsum(transition_rates, axis=1) / leave_rates[:, None]
+        # the cumulative sums can end slightly below 1 due to rounding
+        jump_cum_probs[:, -1] = 1.0
+        self.jump_cum_probs = jump_cum_probs.tolist()
+        self.total_rates = self.total_rates.tolist()
+        self.num_states = num_states
+        self.state = initial_state
+
+    def generate_block(self, n):
+        rng = self.get_rng()
+        samples = np.empty(n)
+        state = self.state
+        # time spent since the last arrival
+        elapsed = 0
+        idx = 0
+        while idx < n:
+            # random numbers for the next batch of events (each arrival needs at least one event)
+            count = n - idx
+            exps = rng.exponential(1, size=count).tolist()
+            unifs = rng.random(count).tolist()
+            for e, u in zip(exps, unifs):
+                elapsed += e / self.total_rates[state]
+                arrival_prob = self.arrival_probs[state]
+                if u < arrival_prob:
+                    samples[idx] = elapsed
+                    elapsed = 0
+                    idx += 1
+                else:
+                    # reuse the uniform sample for choosing the next state
+                    u = (u - arrival_prob) / (1 - arrival_prob)
+                    state = min(bisect_right(self.jump_cum_probs[state], u), self.num_states - 1)
+        self.state = state
+        return samples
+
+
+class BatchSimProcess(SimProcess):
+    """BatchSimProcess extends the functionality of :class:`~simfaas.SimProcess.SimProcess` for batch arrivals,
+where several requests arrive at once (e.g. fan-out or scheduled jobs). The time between batches is generated by
+`process`, and the number of requests in each batch is drawn from `batch_sizes` with probabilities `batch_probs`.
+The simulator processes all the requests in a batch in a single step.
+
+    Parameters
+    ----------
+    process : simfaas.SimProcess.SimProcess
+        The process generating the time between batches
+    batch_sizes : list[int]
+        The possible number of requests in each batch
+    batch_probs : list[float], optional
+        The probability of each batch size, by default None which makes them equally likely
+    block_size : int, optional
+        The number of batch sizes drawn at once, by default 1024
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used for drawing batch sizes, if present, an
+        independent stream is also spawned from it for `process`, by default None
+
+    Raises
+    ------
+    ValueError
+        Raises if a batch size is smaller than one
+    """
+    def __init__(self, process, batch_sizes, batch_probs=None, block_size=1024, rng=None):
+        self.block_size = block_size
+        self.process = process
+        super().__init__(rng=rng)
+
+        self.has_batches = True
+        self.batch_sizes = np.atleast_1d(np.asarray(batch_sizes, dtype=int))
+        if np.any(self.batch_sizes < 1):
+            raise ValueError("Batch sizes should be at least 1!")
+        self.batch_probs = None if batch_probs is None else np.asarray(batch_probs, dtype=float)
+
+    def set_rng(self, rng=None):
+        # the process generating the time between batches gets its own stream
+        if rng is not None:
+            rng, process_seed = spawn_seeds(rng, 2)
+            self.process.set_rng(process_seed)
+        super().set_rng(rng)
+        # batch sizes drawn but not handed out yet, these are discarded when the generator changes
+        self.batch_block = []
+        self.batch_block_idx = 0
+
+    def generate_trace(self):
+        return self.process.generate_trace()
+
+    def generate_trace_at(self, t):
+        return self.process.generate_trace_at(t)
+
+    def generate_traces(self, n):
+        return self.process.generate_traces(n)
+
+    def generate_batch_size(self):
+        if self.batch_block_idx >= len(self.batch_block):
+            self.batch_block = self.get_rng().choice(self.batch_sizes, size=self.block_size, p=self.batch_probs).tolist()
+            self.batch_block_idx = 0
+        val = self.batch_block[self.batch_block_idx]
+        self.batch_block_idx += 1
+        return val
 
 
 class ConstSimProcess(SimProcess):
@@ -148,11 +722,15 @@ constant processes, meaning this is a deterministic process and fires exactly ev
     def generate_trace(self):
         return 1/self.rate
 
+    def generate_traces(self, n):
+        return np.full(n, 1/self.rate)
 
-class GaussianSimProcess(SimProcess):
+
+class GaussianSimProcess(BufferedSimProcess):
     """GaussianSimProcess extends the functionality of :class:`~simfaas.SimProcess.SimProcess` for
 gaussian processes. This class also implements the `pdf` and `cdf` functions
-which can be used for visualization purposes.
+which can be used for visualization purposes. Samples are drawn in blocks as described in
+:class:`~simfaas.SimProcess.BufferedSimProcess`.
 
     Parameters
     ----------
@@ -160,16 +738,20 @@ which can be used for visualization purposes.
         The rate at which the process should fire off
     std : float
         The standard deviation of the simulated process
+    block_size : int, optional
+        The number of samples drawn at once, by default 1024
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used for drawing samples, by default None
     """
-    def __init__(self, rate, std):
-        super().__init__()
+    def __init__(self, rate, std, block_size=1024, rng=None):
+        super().__init__(block_size=block_size, rng=rng)
         self.has_pdf = True
         self.has_cdf = True
         self.rate = rate
         self.std = std
 
-    def generate_trace(self):
-        return max(0, np.random.normal(loc=1/self.rate, scale=self.std))
+    def generate_block(self, n):
+        return np.maximum(0, self.get_rng().normal(loc=1/self.rate, scale=self.std, size=n))
 
     def pdf(self, x):
         return norm.pdf(x, loc=1/self.rate, scale=self.std)
@@ -177,6 +759,316 @@ which can be used for visualization purposes.
     def cdf(self, x):
         return norm.cdf(x, loc=1/self.rate, scale=self.std)
 
+class EmpiricalSimProcess(BufferedSimProcess):
+    """EmpiricalSimProcess extends the functionality of :class:`~simfaas.SimProcess.SimProcess` for processes
+following a measured distribution, given either as the observed samples, or as a histogram (bin edges and the
+number of observations in each bin). When built from samples, the process draws from the samples with equal
+probability, and when built from a histogram, a bin is drawn using an alias table and the sample is uniformly
+distributed within that bin, so each sample takes constant time regardless of the number of samples or bins. This
+class also implements vectorized `pdf` and `cdf` functions which can be used for visualization purposes, the pdf of
+a process built from samples is calculated from a histogram of `num_bins` bins. Samples are drawn in blocks as
+described in :class:`~simfaas.SimProcess.BufferedSimProcess`.
+
+    Parameters
+    ----------
+    samples : list[float], optional
+        The observed samples, by default None
+    bin_edges : list[float], optional
+        The edges of the histogram bins, one more than the number of bins, by default None
+    bin_counts : list[float], optional
+        The number of observations (or the weight) of each histogram bin, by default None
+    num_bins : int, optional
+        The number of bins used for calculating the pdf of a process built from samples, by default 100
+    block_size : int, optional
+        The number of samples drawn at once, by default 1024
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The random generator (or the seed for creating one) used for drawing samples, by default None
+
+    Raises
+    ------
+    ValueError
+        Raises if neither or both of `samples` and the histogram are passed, or if the histogram is not valid
+    """
+    def __init__(self, samples=None, bin_edges=None, bin_counts=None, num_bins=100, block_size=1024, rng=None):
+        super().__init__(block_size=block_size, rng=rng)
+
+        self.has_pdf = True
+        self.has_cdf = True
+
+        if (samples is None) == (bin_edges is None or bin_counts is None):
+            raise ValueError("Either samples, or bin_edges and bin_counts should be passed!")
+
+        if samples is not None:
+            self.samples = np.sort(np.asarray(samples, dtype=float))
+            if len(self.samples) == 0:
+                raise ValueError("At least one sample is needed!")
+            bin_counts, bin_edges = np.histogram(self.samples, bins=num_bins)
+        else:
+            self.samples = None
+
+        self.bin_edges = np.asarray(bin_edges, dtype=float)
+        bin_counts = np.asarray(bin_counts, dtype=float)
+        if len(self.bin_edges) != len(bin_counts) + 1:
+            raise ValueError("There should be one more bin edge than bin counts!")
+        if np.any(np.diff(self.bin_edges) <= 0) or np.any(bin_counts < 0) or bin_counts.sum() <= 0:
+            raise ValueError("Bin edges should be increasing, and bin counts should be non-negative with a positive sum!")
+
+        self.bin_widths = np.diff(self.bin_edges)
+        self.bin_probs = bin_counts / bin_counts.sum()
+        self.bin_cum_probs = np.concatenate([[0], np.cumsum(self.bin_probs)])
+        self.alias_probs, self.alias_idxs = self.build_alias_table(self.bin_probs)
+
+    @staticmethod
+    def build_alias_table(probs):
+        """Build the alias table (using Vose's method) for drawing from a discrete distribution in constant time.
+
+        Parameters
+        ----------
+        probs : numpy.ndarray
+            The probability of each outcome
+
+        Returns
+        -------
+        numpy.ndarray, numpy.ndarray
+            (alias_probs, alias_idxs) where outcome `i` is kept with probability `alias_probs[i]`, and replaced by `alias_idxs[i]` otherwise
+        """
+        n = len(probs)
+        scaled = probs * n
+        alias_probs = np.ones(n)
+        alias_idxs = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1]
+        large = [i for i in range(n) if scaled[i] >= 1]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            alias_probs[s] = scaled[s]
+            alias_idxs[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1
+            if scaled[l] < 1:
+                small.append(l)
+            else:
+                large.append(l)
+        # what remains has a probability of one (up to rounding errors)
+        return alias_probs, alias_idxs
+
+    def pdf(self, x):
+        x = np.asarray(x, dtype=float)
+        idxs = np.searchsorted(self.bin_edges, x, side='right') - 1
+        inside = (idxs >= 0) & (idxs < len(self.bin_probs))
+        idxs = np.clip(idxs, 0, len(self.bin_probs) - 1)
+        return np.where(inside, self.bin_probs[idxs] / self.bin_widths[idxs], 0)
+
+    def cdf(self, x):
+        if self.samples is not None:
+            return np.searchsorted(self.samples, x, side='right') / len(self.samples)
+        return np.interp(x, self.bin_edges, self.bin_cum_probs)
+
+    def generate_block(self, n):
+        rng = self.get_rng()
+        if self.samples is not None:
+            idxs = (rng.random(n) * len(self.samples)).astype(int)
+            return self.samples[idxs]
+
+        idxs = (rng.random(n) * len(self.bin_probs)).astype(int)
+        idxs = np.where(rng.random(n) < self.alias_probs[idxs], idxs, self.alias_idxs[idxs])
+        return self.bin_edges[idxs] + rng.random(n) * self.bin_widths[idxs]
+
+
+class TraceSimProcess(BufferedSimProcess):
+    """TraceSimProcess replays the events recorded in a trace (e.g. the timestamps of the invocations in a
+production request log) by generating the time between consecutive timestamps. The trace is never loaded as a
+whole: `.npy` files and raw binary files are memory-mapped, CSV files are parsed `chunk_size` rows at a time, and
+the next chunk is read in a background thread while the current one is being used. Once the trace is exhausted, the
+generated samples are `inf`, meaning no more events will happen, and the file and the background thread are released.
+To release them before the end of the trace, call :func:`~simfaas.SimProcess.TraceSimProcess.close` or use the
+process as a context manager. Note that pickling the process (e.g. to send it to worker processes) gives a copy that
+replays the trace from the beginning.
+
+    Parameters
+    ----------
+    path : str
+        The path of the trace, a `.npy` file, a `.csv` file, or a raw binary file of type `dtype` for other extensions
+    column : int, str, optional
+        The column holding the timestamps, an index or a column name for CSV files, or an index for 2-dimensional
+        `.npy` files, by default 0
+    time_scale : float, optional
+        The factor used to convert the timestamps to simulation time units, e.g. 1e-3 for timestamps in milliseconds, by default 1
+    start_time : float, optional
+        The time (in the units of the trace) corresponding to the start of the simulation, by default None which
+        starts the simulation at the first timestamp, making the first sample 0
+    header : bool, optional
+        Whether the CSV file has a header row, by default True
+    dtype : numpy.dtype, optional
+        The type of the timestamps in raw binary files, by default float
+    chunk_size : int, optional
+        The number of timestamps read from the trace at once, by default 65536
+    read_ahead : bool, optional
+        Whether the next chunk should be read in a background thread, by default True
+    block_size : int, optional
+        The number of samples prepared at once, by default 1024
+
+    Raises
+    ------
+    ValueError
+        Raises when the timestamps in the trace are not sorted
+    """
+    def __init__(self, path, column=0, time_scale=1, start_time=None, header=True, dtype=float, chunk_size=65536,
+                 read_ahead=True, block_size=1024):
+        self.path = path
+        self.column = column
+        self.time_scale = time_scale
+        self.start_time = start_time
+        self.header = header
+        self.dtype = dtype
+        self.chunk_size = chunk_size
+        self.read_ahead = read_ahead
+        self.__dict__.update(self.get_initial_state())
+
+        super().__init__(block_size=block_size)
+
+        self.has_pdf = False
+        self.has_cdf = False
+
+    def get_initial_state(self):
+        """Get the values of the attributes holding the progress of reading the trace, before anything is read.
+
+        Returns
+        -------
+        dict
+            The initial values of the attributes
+        """
+        return {
+            'block': [],
+            'block_idx': 0,
+            # the chunks of timestamps, the next chunk being read, and the thread reading it, created on first use
+            'chunks': None,
+            'next_chunk': None,
+            'executor': None,
+            'exhausted': False,
+            # timestamps read from the trace, but not used yet
+            'pending': np.zeros(0),
+            'last_time': None if self.start_time is None else self.start_time * self.time_scale,
+        }
+
+    def __getstate__(self):
+        # open files and threads cannot be pickled
+        state = self.__dict__.copy()
+        state.update(self.get_initial_state())
+        return state
+
+    def set_rng(self, rng=None):
+        # the samples come from the trace, so they are not discarded when the generator changes
+        SimProcess.set_rng(self, rng)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Release the trace file and stop the thread reading ahead, if the next sample is requested afterwards, the
+trace is read again from the beginning.
+        """
+        # wait for the thread first, since the chunks cannot be closed while it is reading from them
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if self.chunks is not None:
+            self.chunks.close()
+            self.chunks = None
+        self.next_chunk = None
+
+    def reset(self):
+        """Close the trace, so that the next sample is generated from the beginning of the trace.
+        """
+        self.close()
+        self.__dict__.update(self.get_initial_state())
+
+    def iter_timestamp_chunks(self):
+        """Read the timestamps in the trace in chunks of `chunk_size`.
+
+        Yields
+        -------
+        numpy.ndarray
+            The timestamps in each chunk, converted to simulation time units
+        """
+        if self.path.endswith('.csv'):
+            reader = pd.read_csv(self.path, usecols=[self.column], header=0 if self.header else None,
+                                 chunksize=self.chunk_size)
+            for chunk in reader:
+                yield chunk.iloc[:, 0].to_numpy(dtype=float) * self.time_scale
+            return
+
+        if self.path.endswith('.npy'):
+            timestamps = np.load(self.path, mmap_mode='r')
+            if timestamps.ndim > 1:
+                timestamps = timestamps[:, self.column]
+        else:
+            timestamps = np.memmap(self.path, dtype=self.dtype, mode='r')
+
+        for chunk_start in range(0, len(timestamps), self.chunk_size):
+            yield np.asarray(timestamps[chunk_start:chunk_start + self.chunk_size], dtype=float) * self.time_scale
+
+    def read_chunk(self):
+        """Get the next chunk of timestamps, and start reading the one after it if `read_ahead` is set.
+
+        Returns
+        -------
+        numpy.ndarray
+            The timestamps in the chunk, or None if the trace is exhausted
+        """
+        if self.exhausted:
+            return None
+        if self.chunks is None:
+            self.chunks = self.iter_timestamp_chunks()
+            if self.read_ahead:
+                self.executor = ThreadPoolExecutor(max_workers=1)
+                self.next_chunk = self.executor.submit(next, self.chunks, None)
+
+        if self.read_ahead:
+            chunk = self.next_chunk.result()
+            if chunk is not None:
+                self.next_chunk = self.executor.submit(next, self.chunks, None)
+        else:
+            chunk = next(self.chunks, None)
+
+        # release the file and the thread as soon as the trace is exhausted
+        if chunk is None:
+            self.close()
+            self.exhausted = True
+        return chunk
+
+    def generate_block(self, n):
+        # read until we have n timestamps, or the trace is exhausted
+        parts = [self.pending]
+        count = len(self.pending)
+        while count < n:
+            chunk = self.read_chunk()
+            if chunk is None:
+                break
+            parts.append(chunk)
+            count += len(chunk)
+
+        timestamps = np.concatenate(parts)
+        self.pending = timestamps[n:]
+        timestamps = timestamps[:n]
+        if len(timestamps) == 0:
+            return np.full(n, np.inf)
+
+        if self.last_time is None:
+            self.last_time = timestamps[0]
+        samples = np.diff(timestamps, prepend=self.last_time)
+        self.last_time = timestamps[-1]
+        if np.any(samples < 0):
+            raise ValueError("Timestamps in the trace should be sorted!")
+
+        # no more events after the end of the trace
+        if len(samples) < n:
+            samples = np.concatenate([samples, np.full(n - len(samples), np.inf)])
+        return samples
+
+
 if __name__ == "__main__":
     print([ConstSimProcess(rate=5).generate_trace() for _ in range(10)])
 
@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 
 def convert_hist_pdf(_values, num_bins):
     """convert_hist_pdf converts the histogram resulting from _values and
@@ -18,18 +19,158 @@ could be plotted and compared with the analytical pdf and cdf functions.
     list[float], list[float], list[float]
         base, values, cumulative are returned which are the histogram bases, density values, and cumulative densities which can be compared with the analytical cdf function
     """
-    values, base = np.histogram(_values, bins=num_bins, density=False)
-    bin_size = base[1] - base[0]
+    counts, edges = np.histogram(np.asarray(_values, dtype=float), bins=num_bins, density=False)
+    bin_size = edges[1] - edges[0]
+
+    # probability of each bin, preceded by two zero-probability points for plotting
+    values = np.zeros(len(counts) + 2)
+    values[2:] = counts / counts.sum()
     cumulative = np.cumsum(values)
-    cumulative = cumulative / cumulative[-1]
-    base = np.append([0, base[0]], base[:-1])
-    cumulative = np.append([0, 0], cumulative)
-    values = np.append([0, 0], values)
-    values = values / np.sum(values)
+    cumulative /= cumulative[-1]
     if bin_size > 0:
         values /= bin_size
 
+    base = np.empty(len(counts) + 2)
+    base[0] = 0
+    base[1] = edges[0]
+    base[2:] = edges[:-1]
     base += bin_size/2
 
     return base, values, cumulative
 
+
+
+def create_rng(rng=None):
+    """create_rng converts the different ways of specifying a source of randomness to a numpy random
+generator, which is used by the processes and schedulers to draw random samples independent from
+the global numpy random state.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        The generator itself, or the seed used to create a new generator, by default None
+
+    Returns
+    -------
+    numpy.random.Generator
+        The random generator, or None if `rng` is None which means the global numpy random state should be used
+    """
+    if rng is None or isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def spawn_seeds(seed, n):
+    """spawn_seeds creates `n` independent seeds from a single seed using `numpy.random.SeedSequence.spawn`,
+which can be used for running several replications of a simulation (e.g. in parallel workers) with
+independent, but reproducible random streams.
+
+    Parameters
+    ----------
+    seed : int, numpy.random.SeedSequence, numpy.random.Generator
+        The root seed, in case of a generator, the entropy for the root seed is drawn from the generator.
+        If None, fresh entropy is taken from the operating system.
+    n : int
+        Number of seeds to spawn
+
+    Returns
+    -------
+    list[numpy.random.SeedSequence]
+        The spawned seeds, which can be passed as `rng` to processes and simulators
+    """
+    if isinstance(seed, np.random.Generator):
+        seed = np.random.SeedSequence(seed.integers(0, 2**32, size=4).tolist())
+    elif not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(n)
+
+
+def encode_states(values):
+    """encode_states encodes a list of states as integer codes, which allows the statistics of custom
+states to be calculated using vectorized numpy operations (e.g. `np.bincount`) instead of python loops.
+States that are all numbers or all strings are encoded using `np.unique`, other hashable states (e.g. tuples,
+`None`, or a mix of types) are encoded using `pandas.factorize`, keeping missing values as states of their own.
+
+    Parameters
+    ----------
+    values : list[object]
+        The states to be encoded
+
+    Returns
+    -------
+    list[object], numpy.ndarray
+        unq_vals, codes where unq_vals is the list of unique states in the order of their first appearance,
+        and codes is an array of the same length as `values` with `unq_vals[codes[i]] == values[i]`
+    """
+    arr = None
+    if isinstance(values, np.ndarray):
+        arr = values
+    elif len(values) > 0:
+        # only convert if all states have the same type, otherwise numpy would cast them (e.g. 0 to '0')
+        value_types = set(map(type, values))
+        if len(value_types) == 1 and issubclass(value_types.pop(), (int, float, str, np.number)):
+            arr = np.asarray(values)
+
+    if arr is not None and arr.ndim == 1 and arr.dtype.kind in 'biufUS':
+        unq_vals, first_idxs, codes = np.unique(arr, return_index=True, return_inverse=True)
+        # reorder the unique values by their first appearance
+        order = np.argsort(first_idxs, kind='stable')
+        ranks = np.empty_like(order)
+        ranks[order] = np.arange(len(order))
+        return unq_vals[order].tolist(), ranks[codes.ravel()]
+
+    series = pd.Series(list(values), dtype=object)
+    try:
+        codes, _ = pd.factorize(series, use_na_sentinel=False)
+    except TypeError:
+        # pandas < 1.5
+        codes, _ = pd.factorize(series, na_sentinel=None)
+    # take the states from the values, since factorize gives missing values (e.g. None) as NaN
+    _, first_idxs = np.unique(codes, return_index=True)
+    return series.iloc[first_idxs].tolist(), codes
+
+
+def run_length_encode(codes, weights):
+    """run_length_encode finds the runs of consecutive equal values in `codes` and sums the `weights`
+over each run, using change-point detection (`np.flatnonzero` over `np.diff`) and segment sums
+(`np.add.reduceat`).
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        The encoded values (e.g. from :func:`~simfaas.Utility.encode_states`)
+    weights : numpy.ndarray
+        The weight of each value, same length as `codes` (e.g. time lengths)
+
+    Returns
+    -------
+    numpy.ndarray, numpy.ndarray
+        run_codes, run_sums where run_codes is the code of each run, and run_sums is the sum of weights in each run
+    """
+    codes = np.asarray(codes)
+    if len(codes) == 0:
+        return codes[:0], np.zeros(0)
+    run_starts = np.concatenate([[0], np.flatnonzero(np.diff(codes) != 0) + 1])
+    return codes[run_starts], np.add.reduceat(np.asarray(weights, dtype=float), run_starts)
+
+
+def group_by_codes(codes, values, num_codes):
+    """group_by_codes splits `values` into groups with the same code, keeping the order of values in each group.
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        The integer code of each value, between 0 and `num_codes - 1`
+    values : numpy.ndarray
+        The values to be grouped, same length as `codes`
+    num_codes : int
+        The number of possible codes
+
+    Returns
+    -------
+    list[numpy.ndarray]
+        The values for each code, an empty array for codes that do not appear
+    """
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=num_codes)
+    return np.split(np.asarray(values)[order], np.cumsum(counts)[:-1])
@@ -11,3 +11,10 @@ from . import ServerlessSimulator
 from . import FunctionInstance
 from . import ParFunctionInstance
 from . import ParServerlessSimulator
+from . import MarkovServerlessSimulator
+from . import InstanceQueue
+from . import Scheduler
+from . import HistoryBuffer
+from . import HistoryWindow
+from . import ReplicationRunner
+from . import ParameterSweep
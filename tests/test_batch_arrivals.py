@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.ParServerlessSimulator import ParServerlessSimulator
+from simfaas.SimProcess import BatchSimProcess, ExpSimProcess
+
+
+class SequentialBatchMixin:
+    # processes the requests in a batch one by one, used as the reference for the single-step batch arrival
+    def batch_arrival(self, t, count):
+        for _ in range(count):
+            if self.is_warm_available(t):
+                self.warm_start_arrival(t)
+            else:
+                self.cold_start_arrival(t)
+
+
+class SequentialServerlessSimulator(SequentialBatchMixin, ServerlessSimulator):
+    pass
+
+
+class SequentialParServerlessSimulator(SequentialBatchMixin, ParServerlessSimulator):
+    pass
+
+
+def run_sim(simulator_class, **kwargs):
+    arrival_process = BatchSimProcess(ExpSimProcess(rate=0.5), [1, 3, 10, 25], rng=7)
+    sim = simulator_class(arrival_process=arrival_process, warm_service_rate=1/2.016, cold_service_rate=1/2.163,
+                          expiration_threshold=20, max_time=5000, rng=11, **kwargs)
+    sim.generate_trace()
+    return sim
+
+
+@pytest.mark.parametrize('simulator_class, sequential_class, kwargs', [
+    (ServerlessSimulator, SequentialServerlessSimulator, {}),
+    (ServerlessSimulator, SequentialServerlessSimulator, {'maximum_concurrency': 15, 'maximum_instances': 12}),
+    (ParServerlessSimulator, SequentialParServerlessSimulator, {'concurrency_value': 4}),
+    (ParServerlessSimulator, SequentialParServerlessSimulator,
+     {'concurrency_value': 4, 'maximum_concurrency': 30, 'maximum_instances': 6}),
+])
+def test_batch_matches_sequential(simulator_class, sequential_class, kwargs):
+    sim = run_sim(simulator_class, **kwargs)
+    ref = run_sim(sequential_class, **kwargs)
+
+    assert np.array_equal(sim.hist_times, ref.hist_times)
+    assert np.array_equal(sim.hist_server_count, ref.hist_server_count)
+    assert np.array_equal(sim.hist_req_cold_idxs, ref.hist_req_cold_idxs)
+    assert np.array_equal(sim.hist_req_warm_idxs, ref.hist_req_warm_idxs)
+    assert np.array_equal(sim.hist_req_rej_idxs, ref.hist_req_rej_idxs)
+    assert sim.get_result_dict() == ref.get_result_dict()
+
+
+def test_batch_request_counts():
+    sim = run_sim(ServerlessSimulator, maximum_concurrency=15, maximum_instances=12)
+    assert sim.total_reject_count > 0
+    assert sim.total_req_count == sim.total_cold_count + sim.total_warm_count + sim.total_reject_count
+    assert len(sim.hist_req_cold_idxs) + len(sim.hist_req_warm_idxs) + len(sim.hist_req_rej_idxs) == sim.total_req_count
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.Utility import encode_states
+
+
+@pytest.fixture(scope='module')
+def sim():
+    sim = ServerlessSimulator(arrival_rate=0.9, warm_service_rate=1/2.016, cold_service_rate=1/2.163,
+                              expiration_threshold=60, max_time=2000, rng=1)
+    sim.generate_trace()
+    return sim
+
+
+def make_states(sim, kind):
+    running = sim.hist_server_running_count.tolist()
+    if kind == 'none':
+        return ['busy' if r > 0 else None for r in running]
+    if kind == 'mixed':
+        return [r if r > 0 else 'idle' for r in running]
+    return [(r, 1) if r > 1 else 0 for r in running]
+
+
+@pytest.mark.parametrize('values, unq_vals, codes', [
+    (['busy', None, 'busy'], ['busy', None], [0, 1, 0]),
+    ([0, 'idle', 0], [0, 'idle'], [0, 1, 0]),
+    ([0, (1, 2), 0, (1, 2)], [0, (1, 2)], [0, 1, 0, 1]),
+    ([3, 1, 3], [3, 1], [0, 1, 0]),
+])
+def test_encode_states(values, unq_vals, codes):
+    got_vals, got_codes = encode_states(values)
+    assert got_vals == unq_vals
+    assert got_codes.tolist() == codes
+
+
+@pytest.mark.parametrize('kind', ['none', 'mixed', 'tuple'])
+def test_calculate_time_average(sim, kind):
+    states = make_states(sim, kind)
+    expected = {}
+    for state, time_length in zip(states, sim.time_lengths):
+        expected[state] = expected.get(state, 0) + time_length
+    total = sum(expected.values())
+
+    unq_vals, val_times = sim.calculate_time_average(states)
+    assert unq_vals == list(expected.keys())
+    assert np.allclose(val_times, [v / total for v in expected.values()])
+
+
+@pytest.mark.parametrize('kind', ['none', 'mixed', 'tuple'])
+def test_get_request_custom_states(sim, kind):
+    states = make_states(sim, kind)
+    reqdf = sim.get_request_custom_states(states)
+    assert len(reqdf) == len(set(states))
+    # requests arriving at the first event are not included
+    assert reqdf['total'].sum() == sim.total_req_count - 1
+    assert reqdf['cold'].sum() == sim.total_cold_count - 1
+
+
+@pytest.mark.parametrize('kind', ['none', 'mixed', 'tuple'])
+def test_analyze_custom_states(sim, kind):
+    states = make_states(sim, kind)
+    residence_times, transition_times = sim.analyze_custom_states(states)
+    assert set(residence_times.keys()) <= set(states)
+    for (from_state, to_state), times in transition_times.items():
+        assert from_state != to_state
+        assert len(times) > 0
+    assert sum(len(t) for t in residence_times.values()) == sum(len(t) for t in transition_times.values())
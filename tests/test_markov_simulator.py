@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from simfaas.MarkovServerlessSimulator import MarkovServerlessSimulator
+from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.ReplicationRunner import ReplicationRunner
+from simfaas.Scheduler import MRUScheduler, OldestFirstScheduler
+from simfaas.SimProcess import ExpSimProcess
+
+PARAMS = dict(arrival_rate=5, warm_service_rate=1/2.016, cold_service_rate=1/2.163, expiration_threshold=10,
+              max_time=5000, maximum_concurrency=12, maximum_instances=14)
+
+
+def test_matches_general_simulator():
+    summaries = []
+    for simulator_class, kwargs in [(ServerlessSimulator, {'scheduler': MRUScheduler()}), (MarkovServerlessSimulator, {})]:
+        runner = ReplicationRunner({**PARAMS, **kwargs}, simulator_class=simulator_class, seed=1, max_workers=1)
+        runner.run(6)
+        summaries.append(runner.get_summary())
+
+    general, markov = summaries
+    for metric in ['prob_cold', 'prob_reject', 'inst_count_avg', 'inst_running_count_avg', 'inst_idle_count_avg']:
+        tolerance = 4 * (general.loc[metric, 'half_width'] + markov.loc[metric, 'half_width'])
+        assert abs(general.loc[metric, 'mean'] - markov.loc[metric, 'mean']) <= tolerance
+
+
+def test_history_matches_streaming():
+    streaming = MarkovServerlessSimulator(**PARAMS, rng=3)
+    streaming.generate_trace()
+    history = MarkovServerlessSimulator(**PARAMS, rng=3, record_history=True)
+    history.generate_trace()
+
+    results = history.get_result_dict()
+    for key, value in streaming.get_result_dict().items():
+        assert results[key] == pytest.approx(value)
+    assert history.total_req_count == len(history.hist_req_cold_idxs) + len(history.hist_req_warm_idxs) + \
+        len(history.hist_req_rej_idxs)
+
+
+def test_seeded_processes_are_reproducible():
+    def run():
+        sim = MarkovServerlessSimulator(arrival_process=ExpSimProcess(rate=2, rng=5),
+                                        warm_service_process=ExpSimProcess(rate=1/2.016, rng=6),
+                                        cold_service_process=ExpSimProcess(rate=1/2.163, rng=7),
+                                        expiration_threshold=10, max_time=1000)
+        sim.generate_trace()
+        return sim.get_result_dict()
+
+    assert run() == run()
+
+
+def test_invalid_arguments():
+    class ScaledExpSimProcess(ExpSimProcess):
+        def generate_trace(self):
+            return 2 * super().generate_trace()
+
+    with pytest.raises(ValueError):
+        MarkovServerlessSimulator(arrival_process=ScaledExpSimProcess(rate=1), warm_service_rate=1,
+                                  cold_service_rate=1, expiration_threshold=10, max_time=100)
+    with pytest.raises(ValueError):
+        MarkovServerlessSimulator(**PARAMS, scheduler=OldestFirstScheduler())
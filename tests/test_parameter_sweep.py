@@ -0,0 +1,51 @@
+import os
+
+import simfaas.ParameterSweep
+from simfaas.ParameterSweep import ParameterSweep
+
+GRID = {
+    'arrival_rate': [0.5, 1.0],
+    'warm_service_rate': 1/2.016,
+    'cold_service_rate': 1/2.163,
+    'expiration_threshold': [30, 60],
+    'max_time': 1000,
+}
+
+
+def test_expand_grid():
+    points = ParameterSweep.expand_grid(GRID)
+    assert len(points) == 4
+    assert {(p['arrival_rate'], p['expiration_threshold']) for p in points} == {(0.5, 30), (0.5, 60), (1.0, 30), (1.0, 60)}
+    assert all(p['max_time'] == 1000 for p in points)
+
+
+def test_cache_hits_and_misses(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path)
+    sweep = ParameterSweep(GRID, seed=1, cache_dir=cache_dir, max_workers=1)
+    first = sweep.run()
+    assert len(os.listdir(cache_dir)) == 4
+
+    # a cache hit gives the same results without simulating the point again
+    with monkeypatch.context() as m:
+        def fail(*args):
+            raise AssertionError("cached point simulated again")
+        m.setattr(simfaas.ParameterSweep, 'run_sweep_chunk', fail)
+        sweep = ParameterSweep(GRID, seed=1, cache_dir=cache_dir, max_workers=1)
+        assert sweep.run().equals(first)
+
+    # a new seed or new parameters are cache misses
+    sweep = ParameterSweep(GRID, seed=2, cache_dir=cache_dir, max_workers=1)
+    assert not sweep.run()['prob_cold'].equals(first['prob_cold'])
+    assert len(os.listdir(cache_dir)) == 8
+    sweep = ParameterSweep({**GRID, 'max_time': 1500}, seed=1, cache_dir=cache_dir, max_workers=1)
+    sweep.run()
+    assert len(os.listdir(cache_dir)) == 12
+
+
+def test_unseeded_points_are_independent(tmp_path):
+    point = {k: v[0] if isinstance(v, list) else v for k, v in GRID.items()}
+    sweep = ParameterSweep([point] * 4, cache_dir=str(tmp_path), max_workers=1)
+    results = sweep.run()
+    assert results['prob_cold'].nunique() > 1
+    # results are only cached when a seed is given
+    assert os.listdir(str(tmp_path)) == []
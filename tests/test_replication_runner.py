@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from simfaas.ReplicationRunner import ReplicationRunner
+
+PARAMS = dict(arrival_rate=0.9, warm_service_rate=1/2.016, cold_service_rate=1/2.163, expiration_threshold=60,
+              max_time=2000)
+
+
+def test_summary_confidence_interval():
+    runner = ReplicationRunner(PARAMS, seed=1, max_workers=1)
+    runner.run(8)
+    summary = runner.get_summary(confidence=0.95)
+    values = runner.get_results_df()['prob_cold']
+
+    row = summary.loc['prob_cold']
+    assert row['count'] == 8
+    assert row['mean'] == pytest.approx(values.mean())
+    assert row['std'] == pytest.approx(values.std(ddof=1))
+    # t quantile for 7 degrees of freedom
+    assert row['half_width'] == pytest.approx(2.364624 * values.std(ddof=1) / np.sqrt(8), rel=1e-5)
+    assert row['ci_low'] == pytest.approx(row['mean'] - row['half_width'])
+    assert row['ci_high'] == pytest.approx(row['mean'] + row['half_width'])
+
+
+def test_replications_are_reproducible_and_independent():
+    first = ReplicationRunner(PARAMS, seed=2, max_workers=1)
+    second = ReplicationRunner(PARAMS, seed=2, max_workers=1)
+    first.run(4)
+    second.run(4)
+
+    assert first.results == second.results
+    assert len({r['prob_cold'] for r in first.results}) == 4
+
+
+def test_run_until_half_width():
+    runner = ReplicationRunner(PARAMS, seed=3, max_workers=1)
+    summary = runner.run_until(metric='prob_cold', half_width=0.01, min_replications=4, max_replications=50)
+    assert len(runner.results) >= 4
+    assert summary.loc['prob_cold', 'half_width'] < 0.01 or len(runner.results) == 50
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from simfaas.SimProcess import MMPPSimProcess, NonHomogeneousExpSimProcess
+
+
+def test_mmpp_rate():
+    # the long-run arrival rate is the average of the rates over the stationary distribution of the states
+    transition_rates = np.array([[0, 0.2, 0.1], [0.4, 0, 0.2], [0.3, 0.3, 0]])
+    rates = np.array([1.0, 5.0, 0.5])
+    generator = transition_rates - np.diag(transition_rates.sum(axis=1))
+    a = np.vstack([generator.T, np.ones(3)])
+    stationary = np.linalg.lstsq(a, np.r_[np.zeros(3), 1], rcond=None)[0]
+
+    process = MMPPSimProcess(rates, transition_rates, rng=1)
+    samples = process.generate_traces(200000)
+    assert 1 / samples.mean() == pytest.approx(stationary @ rates, rel=0.03)
+
+
+def test_mmpp_random_chains():
+    rng = np.random.default_rng(0)
+    for seed in range(200):
+        process = MMPPSimProcess(rng.random(12) + 0.5, rng.random((12, 12)), rng=seed)
+        samples = process.generate_traces(100)
+        assert np.all(samples >= 0)
+
+
+def test_mmpp_invalid():
+    with pytest.raises(ValueError):
+        MMPPSimProcess([1, 2], [[0, 1]])
+    with pytest.raises(ValueError):
+        MMPPSimProcess([0, 1], [[0, 0], [1, 0]])
+
+
+def get_arrival_times(process, n):
+    return np.cumsum(process.generate_traces(n))
+
+
+def test_nhpp_piecewise_rates():
+    # rate 1 in [0, 50) and 4 in [50, 100) of each period
+    process = NonHomogeneousExpSimProcess(rates=[1, 4], rate_times=[0, 50], period=100, rng=1)
+    times = get_arrival_times(process, 100000)
+    periods = np.floor(times[-1] / 100)
+    phase = np.mod(times[times < 100 * periods], 100)
+    assert np.sum(phase < 50) / (50 * periods) == pytest.approx(1, rel=0.03)
+    assert np.sum(phase >= 50) / (50 * periods) == pytest.approx(4, rel=0.03)
+
+
+def test_nhpp_rate_function():
+    def rate_function(t):
+        return 2 + np.sin(2 * np.pi * np.asarray(t) / 100)
+
+    process = NonHomogeneousExpSimProcess(rate_function=rate_function, max_rate=3, rng=2)
+    times = get_arrival_times(process, 100000)
+    periods = np.floor(times[-1] / 100)
+    phase = np.mod(times[times < 100 * periods], 100)
+
+    # the integral of the rate over the first and second half of each period
+    first_half = 100 + 100 / np.pi
+    second_half = 100 - 100 / np.pi
+    assert np.sum(phase < 50) / periods == pytest.approx(first_half, rel=0.03)
+    assert np.sum(phase >= 50) / periods == pytest.approx(second_half, rel=0.03)
+
+
+def test_nhpp_invalid():
+    with pytest.raises(ValueError):
+        NonHomogeneousExpSimProcess(rates=[1, 2])
+    with pytest.raises(ValueError):
+        NonHomogeneousExpSimProcess(rates=[1, 2], rate_times=[0, 50], period=40)
+    with pytest.raises(ValueError):
+        NonHomogeneousExpSimProcess(rate_function=np.ones_like)
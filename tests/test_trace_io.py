@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from simfaas.ServerlessSimulator import ServerlessSimulator
+from simfaas.ParServerlessSimulator import ParServerlessSimulator
+
+PARAMS = dict(arrival_rate=0.9, warm_service_rate=1/2.016, cold_service_rate=1/2.163, expiration_threshold=60,
+              max_time=3000, rng=1)
+
+
+@pytest.mark.parametrize('simulator_class, kwargs', [
+    (ServerlessSimulator, {}),
+    (ParServerlessSimulator, {'concurrency_value': 3}),
+])
+@pytest.mark.parametrize('mmap_mode', ['r', None])
+def test_save_load_round_trip(tmp_path, simulator_class, kwargs, mmap_mode):
+    sim = simulator_class(**PARAMS, **kwargs)
+    sim.generate_trace()
+    sim.save_trace(str(tmp_path))
+
+    loaded = simulator_class(**PARAMS, **kwargs)
+    loaded.load_trace(str(tmp_path), mmap_mode=mmap_mode)
+
+    for name in simulator_class.trace_columns:
+        assert np.array_equal(getattr(loaded, name), getattr(sim, name))
+    for name in simulator_class.trace_attributes:
+        assert getattr(loaded, name) == getattr(sim, name)
+    assert loaded.get_result_dict() == sim.get_result_dict()
+
+    states = sim.hist_server_running_count
+    loaded_vals, loaded_times = loaded.calculate_time_average(states, skip_init_time=100)
+    vals, times = sim.calculate_time_average(states, skip_init_time=100)
+    assert loaded_vals == vals
+    assert np.allclose(loaded_times, times)
+    assert loaded.get_request_custom_states(states).equals(sim.get_request_custom_states(states))
+
+
+def test_load_trace_checks_simulator(tmp_path):
+    sim = ServerlessSimulator(**PARAMS)
+    sim.generate_trace()
+    sim.save_trace(str(tmp_path))
+    with pytest.raises(Exception):
+        ParServerlessSimulator(concurrency_value=3, **PARAMS).load_trace(str(tmp_path))
+
+
+def test_save_trace_needs_history(tmp_path):
+    sim = ServerlessSimulator(**PARAMS, record_history=False)
+    sim.generate_trace()
+    with pytest.raises(Exception):
+        sim.save_trace(str(tmp_path))